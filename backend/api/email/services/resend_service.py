@@ -98,11 +98,11 @@ class ResendEmailService:
         logger.info(f"Welcome email result for {to}: {result}")
         return result
     
-    def send_weekly_picks_reminder(self, to: str, username: str, upcoming_events: List[Dict]) -> Dict[str, Any]:
-        """Send weekly Thursday reminder to place picks"""
+    def send_weekly_picks_reminder(self, to: str, username: str, upcoming_events: List[Dict], events_html: Optional[str] = None) -> Dict[str, Any]:
+        """Send weekly Thursday reminder to place picks (events_html: pre-rendered events block)"""
         from backend.api.email.templates.weekly_reminder_template import get_weekly_reminder_html
         
-        html_content = get_weekly_reminder_html(username, upcoming_events)
+        html_content = get_weekly_reminder_html(username, upcoming_events, events_html=events_html)
         
         tags = [
             {"name": "category", "value": "weekly_reminder"},
@@ -1,9 +1,7 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 
-def get_weekly_reminder_html(username: str, upcoming_events: List[Dict]) -> str:
-    """Generate weekly Thursday picks reminder email HTML"""
-    
-    # Generate events HTML
+def get_weekly_reminder_events_html(upcoming_events: List[Dict]) -> str:
+    """Generate the upcoming events block of the weekly reminder (same for every recipient)"""
     events_html = ""
     if upcoming_events:
         for event in upcoming_events[:3]:  # Show max 3 upcoming events
@@ -33,6 +31,15 @@ def get_weekly_reminder_html(username: str, upcoming_events: List[Dict]) -> str:
             <p>No upcoming events this week, but check back soon for new fights to predict!</p>
         </div>
         """
+    return events_html
+
+def get_weekly_reminder_html(username: str, upcoming_events: List[Dict], events_html: Optional[str] = None) -> str:
+    """Generate weekly Thursday picks reminder email HTML
+    
+    Pass events_html from get_weekly_reminder_events_html to reuse one rendering across recipients.
+    """
+    if events_html is None:
+        events_html = get_weekly_reminder_events_html(upcoming_events)
 
     return f"""
 <!DOCTYPE html>
@@ -44,7 +44,9 @@ async def get_email_stats(admin_user: str = Depends(get_admin_user_from_auth_hea
         marketing_emails = 0
         
         for user in result.data or []:
-            settings = user.get('settings', {})
+            settings = user.get('settings')
+            if not settings: # Nothing enabled; skip without allocating a default dict
+                continue
             if settings.get('email_notifications', False):
                 email_enabled += 1
             if settings.get('weekly_reminders', False):
@@ -122,7 +124,9 @@ async def send_weekly_reminders_manual(
         
         eligible_users = []
         for user in result.data or []:
-            settings = user.get('settings', {})
+            settings = user.get('settings')
+            if not settings: # No email or preferences stored
+                continue
             email = settings.get('email')
             email_notifications = settings.get('email_notifications', False)
             weekly_reminders = settings.get('weekly_reminders', False)
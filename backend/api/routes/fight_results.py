@@ -10,6 +10,7 @@ from fastapi.responses import JSONResponse
 import logging
 from typing import Optional, List, Dict, Any
 from datetime import datetime
+import gzip
 import json
 
 # Import the database connection
@@ -18,6 +19,14 @@ from backend.api.database import get_supabase_client
 router = APIRouter(prefix="/api/v1/fight-results", tags=["fight-results"])
 logger = logging.getLogger(__name__)
 
+GZIP_MAGIC = b'\x1f\x8b'
+
+def decode_event_file(content: bytes) -> Dict[str, Any]:
+    """Parse an event file downloaded from the bucket, gunzipping it if needed"""
+    if content[:2] == GZIP_MAGIC:
+        content = gzip.decompress(content)
+    return json.loads(content)
+
 def get_bucket_client(bucket_name="fight-events"):
     """Get Supabase storage bucket client"""
     try:
@@ -121,7 +130,7 @@ async def get_event_results(filename: str):
         # Parse JSON data
         try:
             if isinstance(response, bytes):
-                event_data = json.loads(response.decode('utf-8'))
+                event_data = decode_event_file(response)
             else:
                 event_data = response
                 
@@ -159,7 +168,7 @@ async def get_event_accuracy(event_id: str):
         # Parse JSON and extract accuracy stats
         try:
             if isinstance(response, bytes):
-                event_data = json.loads(response.decode('utf-8'))
+                event_data = decode_event_file(response)
             else:
                 event_data = response
                 
@@ -221,7 +230,7 @@ async def get_overall_accuracy_stats():
                     continue
                 
                 if isinstance(file_response, bytes):
-                    event_data = json.loads(file_response.decode('utf-8'))
+                    event_data = decode_event_file(file_response)
                 else:
                     event_data = file_response
                 
@@ -12,7 +12,7 @@ from backend.constants import (
     UNRANKED_VALUE
 )
 import traceback
-from backend.utils import sanitize_json, set_parent_key
+from backend.utils import sanitize_json
 from thefuzz import fuzz, process
 from functools import lru_cache
 import time
@@ -217,39 +217,33 @@ def _sanitize_string(value, default=""):
         return default
     return value
 
+# Fixed parts of the fighter profile schema: defaults applied around the generic sanitizer
+_FIGHT_FIELD_DEFAULTS = {
+    'opponent_name': "", 'result': "", 'method': "", 'time': "", 'date': "", 'event': "",
+    'round': 0, # Ensure round is a number
+}
+_FIGHTER_FIELD_DEFAULTS = {
+    'fighter_name': "", 'Record': "0-0-0", 'Height': "", 'Weight': "",
+    'Reach': "", 'STANCE': "", 'DOB': "", 'image_url': "",
+}
+
 def _sanitize_fighter_data(fighter_data):
     """Sanitize all string fields in fighter data to prevent frontend errors."""
     if not fighter_data:
         return {}
         
-    # For each critical field, set the parent key before sanitizing
-    for key in ['fighter_name', 'Record', 'Height', 'Weight', 'Reach', 'STANCE', 'DOB',
-               'Str. Acc.', 'Str. Def', 'TD Acc.', 'TD Def.']:
-        if key in fighter_data:
-            set_parent_key(key)
-            
     # Handle last_5_fights if present
     if 'last_5_fights' in fighter_data and fighter_data['last_5_fights']:
         # Make sure it's a list
         if not isinstance(fighter_data['last_5_fights'], list):
             fighter_data['last_5_fights'] = [fighter_data['last_5_fights']]
         
-        # Sanitize each fight in the list
-        for i, fight in enumerate(fighter_data['last_5_fights']):
-            # Set parent keys for important fight fields
-            for field in ['opponent_name', 'result', 'method', 'round', 'time', 'date', 'event']:
-                if field in fight:
-                    set_parent_key(field)
-            
-            # Convert any None values to appropriate defaults
+        # Convert any missing/None fight fields to appropriate defaults
+        for fight in fighter_data['last_5_fights']:
             if isinstance(fight, dict):
-                for field in ['opponent_name', 'result', 'method', 'time', 'date', 'event']:
-                    if field not in fight or fight[field] is None:
-                        fight[field] = ""
-                        
-                # Ensure round is a number
-                if 'round' not in fight or fight['round'] is None:
-                    fight['round'] = 0
+                for field, default in _FIGHT_FIELD_DEFAULTS.items():
+                    if fight.get(field) is None:
+                        fight[field] = default
             
         # Log the fights for debugging
         logger.info(f"Sanitized {len(fighter_data['last_5_fights'])} fights")
@@ -258,22 +252,9 @@ def _sanitize_fighter_data(fighter_data):
     sanitized = sanitize_json(fighter_data)
             
     # Ensure critical fields exist with defaults
-    if 'fighter_name' not in sanitized or not sanitized['fighter_name']:
-        sanitized['fighter_name'] = ""
-    if 'Record' not in sanitized or not sanitized['Record']:
-        sanitized['Record'] = "0-0-0"
-    if 'Height' not in sanitized or not sanitized['Height']:
-        sanitized['Height'] = ""
-    if 'Weight' not in sanitized or not sanitized['Weight']:
-        sanitized['Weight'] = ""
-    if 'Reach' not in sanitized or not sanitized['Reach']:
-        sanitized['Reach'] = ""
-    if 'STANCE' not in sanitized or not sanitized['STANCE']:
-        sanitized['STANCE'] = ""
-    if 'DOB' not in sanitized or not sanitized['DOB']:
-        sanitized['DOB'] = ""
-    if 'image_url' not in sanitized or not sanitized['image_url']:
-        sanitized['image_url'] = ""
+    for field, default in _FIGHTER_FIELD_DEFAULTS.items():
+        if not sanitized.get(field):
+            sanitized[field] = default
         
     return sanitized
 
@@ -17,7 +17,7 @@ from typing import Dict, List, Optional, Any
 import re
 from urllib.parse import unquote
 from pydantic import BaseModel, Field
-from ...utils import sanitize_json, set_parent_key
+from ...utils import sanitize_json
 
 # Set up logging
 logging.basicConfig(
@@ -172,11 +172,8 @@ async def predict_fight(request: Request):
         f1_weight = features_dict.get('f1_weight', 0.0) # Corresponds to canonical_f1
         f2_weight = features_dict.get('f2_weight', 0.0) # Corresponds to canonical_f2
             
-        # --- Prepare DataFrame for Model --- 
-        prediction_df = pd.DataFrame([features_dict])
-        
-        model_features = trainer.features
-        if model_features is None:
+        # --- Prepare Feature Matrix for Model --- 
+        if trainer.features is None:
             logger.error("Model feature names are missing from the loaded trainer object.")
             raise HTTPException(
                 status_code=500,
@@ -187,21 +184,12 @@ async def predict_fight(request: Request):
                 }
             )
             
-        for col in model_features:
-            if col not in prediction_df.columns:
-                prediction_df[col] = 0.0
-        prediction_df = prediction_df[model_features]
-        
-        if prediction_df.isna().any().any():
-            logger.warning("NaN values found in features before prediction. Filling with 0.")
-            prediction_df = prediction_df.fillna(0.0)
-        if np.isinf(prediction_df).any().any():
-             logger.warning("Infinite values found in features before prediction. Replacing with 0.")
-             prediction_df.replace([np.inf, -np.inf], 0.0, inplace=True)
+        # Model column order, missing features and NaN/inf zeroed
+        prediction_matrix = trainer.features_to_matrix([features_dict])
 
         # --- Initial Model Prediction (based on canonical order) --- 
         logger.info("Making initial prediction (canonical order)...")
-        probability_canonical_f1_model = trainer.predict_proba(prediction_df)[0][1] # Prob of canonical F1 winning
+        probability_canonical_f1_model = trainer.predict_proba(prediction_matrix)[0][1] # Prob of canonical F1 winning
         
         # --- Apply Weight Adjustment (based on canonical weights) --- 
         weight_diff = abs(f1_weight - f2_weight)
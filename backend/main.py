@@ -105,8 +105,7 @@ async def setup_dependencies(app: FastAPI):
 
         # 2. Load Data using DataLoader
         logger.info("Loading fighters and fights data...")
-        fighters_df = app.state.data_loader.load_fighters()
-        fights_df = app.state.data_loader.load_fights()
+        fighters_df, fights_df = app.state.data_loader.load_fighters_and_fights()
         logger.info(f"Loaded {len(fighters_df)} fighters and {len(fights_df)} fights.")
         
         # Preprocess fights_df date column (important for profiler/analyzer)
@@ -158,6 +157,12 @@ async def setup_dependencies(app: FastAPI):
                 raise RuntimeError("Could not load model from bucket or file")
         
         logger.info("UFCTrainer initialized and model loaded.")
+        
+        # Switch to native ONNX scoring when available (falls back to XGBoost)
+        try:
+            app.state.trainer.enable_onnx()
+        except Exception as onnx_error:
+            logger.warning(f"⚠️ ONNX conversion failed, using XGBoost inference: {str(onnx_error)}")
         if app.state.trainer.features is None:
             logger.warning("Loaded model does not contain feature names.")
         else:
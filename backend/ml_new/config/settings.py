@@ -44,7 +44,10 @@ MODEL_PARAMS = {
     'max_depth': 5,
     'random_state': RANDOM_STATE,
     'use_label_encoder': False,
-    'eval_metric': 'logloss'
+    'eval_metric': 'logloss',
+    # xgboost (2.0+) already defaults to these; spelled out so a version bump can't change them silently
+    'tree_method': 'hist',
+    'n_jobs': -1
 }
 
 # Create directories if they don't exist
@@ -1,4 +1,5 @@
 import os
+import hashlib
 import joblib
 import numpy as np
 import pandas as pd
@@ -10,8 +11,28 @@ from sklearn.preprocessing import StandardScaler
 from xgboost import XGBClassifier
 from backend.ml_new.config.settings import DATA_DIR, RANDOM_STATE, TEST_SIZE, VAL_SIZE
 
+# ONNX inference is optional - fall back to XGBoost scoring if unavailable
+try:
+    import onnxruntime as ort
+    from onnxmltools import convert_xgboost
+    from onnxmltools.convert.common.data_types import FloatTensorType
+    onnx_available = True
+except ImportError:
+    onnx_available = False
+
 logger = logging.getLogger(__name__)
 
+# ONNX metadata key holding the SHA-256 of the pickle a graph was exported from
+ONNX_SOURCE_KEY = 'source_sha256'
+
+def _file_sha256(path):
+    """Hex SHA-256 of a file, read in 1 MiB chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 class UFCTrainer:
     def __init__(self):
         self.model = XGBClassifier(
@@ -20,16 +41,24 @@ class UFCTrainer:
             max_depth=5,
             random_state=RANDOM_STATE,
             use_label_encoder=False,
-            eval_metric='logloss'
+            eval_metric='logloss',
+            tree_method='hist', # xgboost's default since 2.0, kept explicit like n_jobs (all cores)
+            n_jobs=-1
         )
         self.scaler = StandardScaler()
+        self.requires_scaling = False # Tree models are scale-invariant; legacy artifacts set this on load
         self.features = None # Initialize features attribute
+        self.feature_keys = () # Frozen copy of features used to vectorize prediction dicts
+        self.onnx_session = None # Native inference session, see enable_onnx()
+        self.onnx_path = None # Pre-exported ONNX graph found next to a loaded model file
+        self.onnx_source_hash = None # SHA-256 of that model file, checked against the graph's metadata
         
     def prepare_data(self, X, y):
         """Split data into train, validation, and test sets."""
         # Capture feature names from DataFrame
         if isinstance(X, pd.DataFrame):
             self.features = X.columns.tolist()
+            self.feature_keys = tuple(self.features)
         elif self.features is None:
             raise ValueError("Feature names missing. Input X must be a pandas DataFrame.")
 
@@ -47,12 +76,35 @@ class UFCTrainer:
             random_state=RANDOM_STATE
         )
         
-        # Scale the features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_val_scaled = self.scaler.transform(X_val)
-        X_test_scaled = self.scaler.transform(X_test)
+        # Scale the features (only for models that need it)
+        if self.requires_scaling:
+            self.scaler.fit(X_train)
+        
+        y_train, y_val, y_test = (np.asarray(y_split, dtype=np.int8) for y_split in (y_train, y_val, y_test))
+        return self._transform(X_train), self._transform(X_val), self._transform(X_test), y_train, y_val, y_test
+    
+    def _transform(self, X):
+        """Apply the fitted scaler if this model was trained on scaled features."""
+        if self.requires_scaling:
+            if not isinstance(X, pd.DataFrame) and hasattr(self.scaler, 'feature_names_in_'):
+                X = pd.DataFrame(X, columns=self.features)
+            return self.scaler.transform(X).astype(np.float32, copy=False)
+        # XGBoost bins in float32 anyway; float64 would only double the bandwidth
+        return np.asarray(X, dtype=np.float32)
+    
+    def features_to_matrix(self, feature_dicts):
+        """Stack feature dicts into a float32 matrix in model feature order.
+        
+        Missing features are filled with 0 and NaN/inf values are zeroed.
+        """
+        if self.features is None:
+            raise RuntimeError("Features not set. Load or train a model first.")
         
-        return X_train_scaled, X_val_scaled, X_test_scaled, y_train, y_val, y_test
+        keys = self.feature_keys
+        X = np.empty((len(feature_dicts), len(keys)), dtype=np.float32)
+        for i, features in enumerate(feature_dicts):
+            X[i] = np.fromiter((features.get(k, 0.0) for k in keys), dtype=np.float32, count=len(keys))
+        return np.nan_to_num(X, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
     
     def train(self, X_train, y_train, X_val, y_val):
         """Train the XGBoost model with validation."""
@@ -74,17 +126,73 @@ class UFCTrainer:
         if isinstance(X, pd.DataFrame):
             X = X.reindex(columns=self.features, fill_value=0)
             
-        X_scaled = self.scaler.transform(X)
-        return self.model.predict(X_scaled)
+        return self.model.predict(self._transform(X))
     
     def predict_proba(self, X):
         """Make probability predictions."""
         if isinstance(X, pd.DataFrame):
             X = X.reindex(columns=self.features, fill_value=0)
              
-        X_scaled = self.scaler.transform(X)
+        X_scaled = self._transform(X)
+        if self.onnx_session is not None:
+            # Output 0 is the label, output 1 the (n, 2) probability matrix
+            return self.onnx_session.run(None, {'input': np.asarray(X_scaled, dtype=np.float32)})[1]
         return self.model.predict_proba(X_scaled)
     
+    def _convert_to_onnx(self):
+        """Convert the XGBoost model to an ONNX graph over float32 inputs."""
+        if self.features is None:
+            raise RuntimeError("Cannot convert model without feature list.")
+        return convert_xgboost(
+            self.model,
+            initial_types=[('input', FloatTensorType([None, len(self.features)]))]
+        )
+    
+    def enable_onnx(self):
+        """Score the loaded model through onnxruntime.
+        
+        Single-row predictions through the XGBoost sklearn wrapper carry
+        ~ms of Python overhead; onnxruntime scores the same trees natively.
+        Uses the ONNX file saved alongside the model when load_model found
+        one and it was exported from that exact pickle, otherwise converts in
+        memory. Returns True if the session is active.
+        """
+        if not onnx_available:
+            logger.warning("onnxruntime/onnxmltools not installed. Using XGBoost for inference.")
+            return False
+        
+        session = None
+        if self.onnx_path is not None:
+            session = ort.InferenceSession(self.onnx_path, providers=['CPUExecutionProvider'])
+            exported_from = session.get_modelmeta().custom_metadata_map.get(ONNX_SOURCE_KEY)
+            if exported_from != self.onnx_source_hash:
+                # The pickle was replaced without re-exporting; the graph would score an older model
+                logger.warning(f"⚠️ {self.onnx_path} does not match the loaded model file, converting in memory")
+                session = None
+        if session is None:
+            session = ort.InferenceSession(self._convert_to_onnx().SerializeToString(), providers=['CPUExecutionProvider'])
+        self.onnx_session = session
+        logger.info("⚡ ONNX inference session enabled")
+        return True
+    
+    def save_onnx(self, onnx_path, source_hash=None):
+        """Export the model as an ONNX file so loading skips the conversion step.
+        
+        source_hash (the SHA-256 of the saved pickle) is recorded in the graph's
+        metadata so enable_onnx can tell whether the file still matches the model.
+        """
+        if not onnx_available:
+            logger.warning("onnxmltools not installed. Skipping ONNX export.")
+            return False
+        onnx_model = self._convert_to_onnx()
+        if source_hash is not None:
+            entry = onnx_model.metadata_props.add()
+            entry.key = ONNX_SOURCE_KEY
+            entry.value = source_hash
+        with open(onnx_path, 'wb') as f:
+            f.write(onnx_model.SerializeToString())
+        return True
+    
     def save_model_to_bucket(self, model_name: str, model_version: str, training_scores: dict = None):
         """Save model to Supabase storage bucket."""
         if self.features is None:
@@ -97,12 +205,13 @@ class UFCTrainer:
         model_data = {
             'model': self.model,
             'scaler': self.scaler,
+            'requires_scaling': self.requires_scaling,
             'features': self.features
         }
         
         # Create temporary file
         with tempfile.NamedTemporaryFile(suffix='.pkl', delete=False) as temp_file:
-            joblib.dump(model_data, temp_file.name)
+            joblib.dump(model_data, temp_file.name, compress=0)
             temp_file_path = temp_file.name
         
         try:
@@ -146,6 +255,7 @@ class UFCTrainer:
                 'file_size': file_size,
                 'model_metadata': {
                     'feature_count': len(self.features),
+                    'requires_scaling': self.requires_scaling,
                     'model_params': self.model.get_params()
                 }
             }
@@ -250,7 +360,12 @@ class UFCTrainer:
                 # Set trainer attributes
                 self.model = model_data['model']
                 self.scaler = model_data['scaler']
+                self.requires_scaling = model_data.get('requires_scaling', True) # Older artifacts were always scaled
                 self.features = model_data['features']
+                self.feature_keys = tuple(self.features)
+                self.onnx_session = None
+                self.onnx_path = None
+                self.onnx_source_hash = None
                 
                 logger.info(f"✅ Latest model '{latest_file['name']}' loaded successfully from bucket")
                 logger.info(f"📊 Model features: {len(self.features) if self.features else 'Unknown'}")
@@ -306,13 +421,35 @@ class UFCTrainer:
         model_data = {
             'model': self.model,
             'scaler': self.scaler,
+            'requires_scaling': self.requires_scaling,
             'features': self.features
         }
-        joblib.dump(model_data, model_path)
+        # Uncompressed so load_model can memory-map arrays instead of inflating them
+        joblib.dump(model_data, model_path, compress=0)
+        
+        # Ship a pre-converted ONNX graph next to the pickle; the pickle stays the fallback
+        onnx_path = os.path.splitext(model_path)[0] + '.onnx'
+        try:
+            if not self.save_onnx(onnx_path, source_hash=_file_sha256(model_path)) and os.path.exists(onnx_path):
+                os.remove(onnx_path) # Don't leave a graph from an older model behind
+        except Exception as e:
+            logger.warning(f"⚠️ ONNX export failed, saved pickle only: {str(e)}")
+            if os.path.exists(onnx_path):
+                os.remove(onnx_path)
     
     def load_model(self, model_path):
-        """Load model from disk."""
-        model_data = joblib.load(model_path)
+        """Load model from disk, memory-mapping numpy arrays (scaler stats) read-only."""
+        model_data = joblib.load(model_path, mmap_mode='r')
         self.model = model_data['model']
         self.scaler = model_data['scaler']
-        self.features = model_data['features'] 
\ No newline at end of file
+        self.requires_scaling = model_data.get('requires_scaling', True) # Older artifacts were always scaled
+        self.features = model_data['features']
+        self.feature_keys = tuple(self.features)
+        self.onnx_session = None
+        onnx_path = os.path.splitext(model_path)[0] + '.onnx'
+        if os.path.exists(onnx_path):
+            self.onnx_path = onnx_path
+            self.onnx_source_hash = _file_sha256(model_path)
+        else:
+            self.onnx_path = None
+            self.onnx_source_hash = None 
\ No newline at end of file
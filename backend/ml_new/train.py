@@ -1,5 +1,6 @@
 import os
 import sys
+import gc
 from pathlib import Path
 from datetime import timezone # Import timezone
 from datetime import datetime # Import datetime for model version
@@ -35,8 +36,7 @@ def main():
     # 1. Load Data
     logger.info("Loading data...")
     data_loader = DataLoader() 
-    fighters_df = data_loader.load_fighters()
-    fights_df = data_loader.load_fights()
+    fighters_df, fights_df = data_loader.load_fighters_and_fights()
     # Ensure fight_date is datetime and timezone-aware (UTC)
     fights_df['fight_date'] = pd.to_datetime(fights_df['fight_date'], errors='coerce')
     if fights_df['fight_date'].dt.tz is None:
@@ -63,26 +63,33 @@ def main():
     # 3. Generate Features with Context (Preventing Data Leakage)
     logger.info("Generating time-contextual features for each fight...")
     all_features_list = []
-    skipped_fights = 0
+
+    # Basic validation in one pass: both names must be present strings
+    # (NaN/None/numbers fail the type check), so the loop below needs no guards
+    valid_names = fights_df['fighter_name'].map(type).eq(str) & fights_df['opponent'].map(type).eq(str)
+    valid_fights = fights_df[valid_names]
+    skipped_fights = len(fights_df) - len(valid_fights)
+    if skipped_fights:
+        logger.warning(f"Skipping {skipped_fights} fights with missing fighter or opponent names.")
+
+    # Labels are derived in one vectorized pass, and the loop walks plain column
+    # values instead of iterrows(), which builds a pandas Series for every fight
+    targets = (valid_fights['result'] == 'W').astype(np.int8)
+    fight_rows = zip(
+        valid_fights['fighter_name'],
+        valid_fights['opponent'], # Use original opponent column name
+        valid_fights['fight_date'], # This is the context_date
+        targets
+    )
 
     # Iterate through each fight in the historical data
     # Use tqdm for a progress bar
-    for index, fight_row in tqdm(fights_df.iterrows(), total=fights_df.shape[0], desc="Generating Features"):
-        fighter1_name = fight_row['fighter_name']
-        fighter2_name = fight_row['opponent'] # Use original opponent column name
-        fight_date = fight_row['fight_date'] # This is the context_date
-        target = 1 if fight_row['result'] == 'W' else 0
-
-        # Basic validation
-        if pd.isna(fighter1_name) or pd.isna(fighter2_name) or not isinstance(fighter1_name, str) or not isinstance(fighter2_name, str):
-            skipped_fights += 1
-            continue
-            
+    for fighter1_name, fighter2_name, fight_date, target in tqdm(fight_rows, total=valid_fights.shape[0], desc="Generating Features"):
         # Generate features using data available *before* the fight_date
         features = analyzer.get_prediction_features(fighter1_name, fighter2_name, context_date=fight_date)
         
         if features: # Only add if features were successfully generated
-            features['target'] = target # Add target variable
+            features['target'] = int(target) # Add target variable
             all_features_list.append(features)
         else:
              skipped_fights += 1
@@ -114,6 +121,15 @@ def main():
         logger.warning(f"Found {inf_count} infinite values. Replacing with 0.")
         X.replace([np.inf, -np.inf], 0, inplace=True)
 
+    # Single precision is plenty for tree splits and halves the training matrix
+    X = X.astype(np.float32)
+    y = y.astype(np.int8)
+
+    # The raw tables, feature tools and per-fight dicts are not needed past this point;
+    # release them so they don't sit alongside XGBoost's histogram buffers during fit
+    del all_features_list, feature_df, profiler, analyzer, fighters_df, fights_df, valid_fights, targets, fight_rows
+    gc.collect()
+
     logger.info(f"Final feature set shape: {X.shape}")
     if X.empty:
          logger.error("Feature DataFrame X is empty. Cannot train.")
@@ -20,20 +20,23 @@ logger = logging.getLogger(__name__)
 
 # Utility functions for data parsing and cleaning
 
+_NC_INFO_RE = re.compile(r'\s*\(.*\)')
+_DIGITS_RE = re.compile(r'\d+')
+
 def parse_record(record_str: str) -> Tuple[int, int, int]:
     """Parse record string (e.g., '26-6-0', '15-3-0 (1 NC)') into (wins, losses, draws)."""
     try:
-        if pd.isna(record_str) or not isinstance(record_str, str): return (0, 0, 0)
+        if not isinstance(record_str, str): return (0, 0, 0) # Covers NaN/None
         # Remove potential NC info
-        record_clean = re.sub(r'\s*\(.*\)', '', record_str).strip()
+        record_clean = _NC_INFO_RE.sub('', record_str).strip()
         parts = record_clean.split('-')
-        if len(parts) == 3:
-            wins = int(parts[0])
-            losses = int(parts[1])
-            # Handle cases where draws might not be purely numeric (though less common)
-            draws = int(re.search(r'\d+', parts[2]).group()) if re.search(r'\d+', parts[2]) else 0
-            return wins, losses, draws
-        else: return (0, 0, 0) # Invalid format
+        if len(parts) != 3: return (0, 0, 0) # Invalid format
+        wins = int(parts[0])
+        losses = int(parts[1])
+        # Handle cases where draws might not be purely numeric (though less common)
+        draws_match = _DIGITS_RE.search(parts[2])
+        draws = int(draws_match.group()) if draws_match else 0
+        return wins, losses, draws
     except Exception as e:
         # logger.warning(f"Could not parse record string: '{record_str}'. Error: {e}")
         return (0, 0, 0)
@@ -109,6 +112,32 @@ def extract_landed_attempted(value_str: str) -> Tuple[int, int]:
         return (0, 0)
 
 
+def sum_landed_attempted(values: pd.Series) -> Tuple[int, int]:
+    """Sum landed/attempted over a column of "X of Y" strings.
+    
+    Vectorized equivalent of summing extract_landed_attempted() row by row:
+    the regex matching runs inside pandas' string engine instead of the interpreter.
+    """
+    strings = values[values.map(lambda v: isinstance(v, str))].astype(str)
+    if strings.empty: return (0, 0)
+    pairs = strings.str.extract(r'(\d+) of (\d+)')
+    landed = pd.to_numeric(pairs[0]).sum()
+    attempted = pd.to_numeric(pairs[1]).sum()
+    # Rows with a single number count as landed with unknown attempts
+    unmatched = strings[pairs[0].isna()]
+    if not unmatched.empty:
+        landed += pd.to_numeric(unmatched.str.extract(r'^(\d+)$')[0]).sum()
+    return int(landed), int(attempted)
+
+
+def sum_control_minutes(values: pd.Series) -> float:
+    """Sum "M:SS" control times in minutes, skipping anything unparseable."""
+    strings = values[values.map(lambda v: isinstance(v, str))].astype(str)
+    if strings.empty: return 0.0
+    parts = strings.str.extract(r'^\s*(\d+)\s*:\s*(\d+)\s*$').dropna()
+    return float((pd.to_numeric(parts[0]) + pd.to_numeric(parts[1]) / 60.0).sum())
+
+
 def calculate_recency_weight(fight_date: Optional[pd.Timestamp], 
                              context_date: pd.Timestamp,
                              base_weight: float = 1.0, 
@@ -163,6 +192,16 @@ class FighterProfiler:
         self.fighters_df = fighters_df.copy()
         self.fights_df = fights_df.copy()
         self.fights_df['fight_date'] = pd.to_datetime(self.fights_df['fight_date'], errors='coerce')
+        if self.fights_df['fight_date'].dt.tz is None:
+            self.fights_df['fight_date'] = self.fights_df['fight_date'].dt.tz_localize(timezone.utc)
+        else:
+            self.fights_df['fight_date'] = self.fights_df['fight_date'].dt.tz_convert(timezone.utc)
+        # Index fighter rows and fight histories by name once, so building a profile
+        # (once per fight during training) is a dict lookup instead of a full table scan
+        unique_fighters = self.fighters_df.drop_duplicates(subset='fighter_name', keep='first')
+        self.fighter_rows = {row['fighter_name']: row for _, row in unique_fighters.iterrows()}
+        self.fights_by_fighter = {name: group for name, group in self.fights_df.groupby('fighter_name', sort=False)}
+        self._no_fights = self.fights_df.iloc[0:0]
         # Cache profiles: key is tuple (fighter_name, exclude_fight_date_iso_or_None)
         self.fighter_profiles_cache = {} 
 
@@ -184,10 +223,10 @@ class FighterProfiler:
         cache_key = (fighter_name, context_date.isoformat() if context_date else None)
         
         if cache_key not in self.fighter_profiles_cache:
-            fighter_data_row = self.fighters_df[self.fighters_df['fighter_name'] == fighter_name]
-            if not fighter_data_row.empty:
+            fighter_data_row = self.fighter_rows.get(fighter_name)
+            if fighter_data_row is not None:
                 self.fighter_profiles_cache[cache_key] = self._build_fighter_profile(
-                    fighter_data_row.iloc[0], context_date
+                    fighter_data_row, context_date
                 )
             else:
                 # logger.warning(f"Fighter '{fighter_name}' not found in fighters_df.")
@@ -200,14 +239,8 @@ class FighterProfiler:
         """Build profile using data strictly *before* context_date."""
         fighter_name = fighter_row.get('fighter_name')
         
-        # Get all fights for the fighter
-        fighter_fights_all_history = self.fights_df[self.fights_df['fighter_name'] == fighter_name].copy()
-        
-        # Ensure fight_date is timezone-aware (UTC) if not already
-        if fighter_fights_all_history['fight_date'].dt.tz is None:
-            fighter_fights_all_history['fight_date'] = fighter_fights_all_history['fight_date'].dt.tz_localize(timezone.utc)
-        else:
-            fighter_fights_all_history['fight_date'] = fighter_fights_all_history['fight_date'].dt.tz_convert(timezone.utc)
+        # Get all fights for the fighter (fight_date already normalized to UTC in __init__)
+        fighter_fights_all_history = self.fights_by_fighter.get(fighter_name, self._no_fights)
         
         # Ensure context_date is also timezone-aware (UTC)
         if context_date.tzinfo is None:
@@ -375,14 +408,10 @@ class FighterProfiler:
         leg_l, leg_a = 0, 0
         sig_l, sig_a = 0, 0
 
-        if 'head_str' in relevant_fights.columns:
-            for val in relevant_fights['head_str']: l, a = extract_landed_attempted(val); head_l += l; head_a += a
-        if 'body_str' in relevant_fights.columns:
-            for val in relevant_fights['body_str']: l, a = extract_landed_attempted(val); body_l += l; body_a += a
-        if 'leg_str' in relevant_fights.columns:
-            for val in relevant_fights['leg_str']: l, a = extract_landed_attempted(val); leg_l += l; leg_a += a
-        if 'sig_str' in relevant_fights.columns:
-             for val in relevant_fights['sig_str']: l, a = extract_landed_attempted(val); sig_l += l; sig_a += a
+        if 'head_str' in relevant_fights.columns: head_l, head_a = sum_landed_attempted(relevant_fights['head_str'])
+        if 'body_str' in relevant_fights.columns: body_l, body_a = sum_landed_attempted(relevant_fights['body_str'])
+        if 'leg_str' in relevant_fights.columns: leg_l, leg_a = sum_landed_attempted(relevant_fights['leg_str'])
+        if 'sig_str' in relevant_fights.columns: sig_l, sig_a = sum_landed_attempted(relevant_fights['sig_str'])
         
         total_landed = sig_l if sig_l > 0 else head_l + body_l + leg_l
         total_attempted = sig_a if sig_a > 0 else head_a + body_a + leg_a
@@ -420,13 +449,8 @@ class FighterProfiler:
 
         # Calculate rates from relevant fights
         td_l, td_a, ctrl_tot, sub_att = 0, 0, 0.0, 0
-        if 'takedowns' in relevant_fights.columns:
-             for val in relevant_fights['takedowns']: l, a = extract_landed_attempted(val); td_l += l; td_a += a
-        if 'ctrl' in relevant_fights.columns:
-             for val in relevant_fights['ctrl']:
-                  if pd.notna(val) and isinstance(val, str) and ':' in val:
-                       try: m, s = map(int, val.split(':')); ctrl_tot += m + s / 60.0
-                       except: pass
+        if 'takedowns' in relevant_fights.columns: td_l, td_a = sum_landed_attempted(relevant_fights['takedowns'])
+        if 'ctrl' in relevant_fights.columns: ctrl_tot = sum_control_minutes(relevant_fights['ctrl'])
         if 'sub_att' in relevant_fights.columns: sub_att = pd.to_numeric(relevant_fights['sub_att'], errors='coerce').fillna(0).sum()
 
         grappling.update({
@@ -485,9 +509,9 @@ class FighterProfiler:
         unique_opponents = relevant_fights['opponent'].dropna().unique()
         opponent_scores = {}
         for opp_name in unique_opponents:
-            opp_data = self.fighters_df[self.fighters_df['fighter_name'] == opp_name]
-            if not opp_data.empty:
-                 opponent_scores[opp_name] = self._calculate_opponent_quality_score(opp_data.iloc[0])
+            opp_data = self.fighter_rows.get(opp_name)
+            if opp_data is not None:
+                 opponent_scores[opp_name] = self._calculate_opponent_quality_score(opp_data)
 
         for _, fight in relevant_fights.iterrows():
              opp_name = fight['opponent']; fight_date = fight['fight_date']; result = fight['result']
@@ -660,9 +684,8 @@ class MatchupAnalyzer:
         
         features.update(matchup_features)
             
-        # Final cleaning
-        final_features = {}
-        for key, value in features.items():
-            final_features[key] = 0.0 if pd.isna(value) or np.isinf(value) else float(value)
+        # Final cleaning - one vectorized NaN/inf pass instead of per-key pd.isna/np.isinf calls
+        values = np.asarray(list(features.values()), dtype=np.float64)
+        values = np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0)
                 
-        return final_features 
\ No newline at end of file
+        return dict(zip(features.keys(), values.tolist())) 
\ No newline at end of file
@@ -3,20 +3,33 @@ import pandas as pd
 import numpy as np
 from supabase import create_client
 import os
+import functools
 # from dotenv import load_dotenv
 from backend.ml_new.config.settings import SUPABASE_URL, SUPABASE_KEY, RANDOM_STATE, TEST_SIZE, VAL_SIZE
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split
 
+try:
+    import orjson
+    orjson_available = True
+except ImportError:
+    orjson_available = False
+
 # load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '../../../.env'))
 
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=1)
+def _get_supabase_client():
+    """Create the Supabase client once per process so loaders share its connection pool."""
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
 class DataLoader:
     def __init__(self):
-        self.supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+        self.supabase = _get_supabase_client()
         self.label_encoders = {}
         self.fighters_df = None
         self.fights_df = None
@@ -28,13 +41,23 @@ class DataLoader:
         start = 0
         
         while count == 1000:
-            data = self.supabase.table(table_name).select("*").range(start, start + 999).execute()
-            count = len(data.data)
-            all_data.extend(data.data)
+            page = self._fetch_page(table_name, start, 1000)
+            count = len(page)
+            all_data.extend(page)
             start += 1000
             
         return pd.DataFrame(all_data)
 
+    def _fetch_page(self, table_name, start, page_size):
+        """Fetch one page of rows, parsing the response body with orjson when available."""
+        if orjson_available:
+            response = self.supabase.postgrest.session.get(
+                f"/{table_name}", params={"select": "*", "offset": start, "limit": page_size}
+            )
+            response.raise_for_status()
+            return orjson.loads(response.content)
+        return self.supabase.table(table_name).select("*").range(start, start + page_size - 1).execute().data
+
     def load_data(self):
         """Load and preprocess fighter and fight data."""
         print("Loading fighter data...")
@@ -155,10 +178,23 @@ class DataLoader:
         except:
             return pd.Series([0, 0, 0])
 
+    def load_fighters_and_fights(self):
+        """Load and clean fighter and fight data, fetching both tables concurrently."""
+        # Both pulls are paginated HTTP round trips; overlapping them halves the wait
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            fighters_future = executor.submit(self.fetch_all_data, "fighters")
+            fights_future = executor.submit(self.fetch_all_data, "fighter_last_5_fights")
+            fighters_df = fighters_future.result()
+            fights_df = fights_future.result()
+        
+        return self._clean_fighters(fighters_df), self._clean_fights(fights_df)
+
     def load_fighters(self):
         """Load and clean fighter data from database"""
-        fighters_df = self.fetch_all_data("fighters")
-        
+        return self._clean_fighters(self.fetch_all_data("fighters"))
+    
+    def _clean_fighters(self, fighters_df):
+        """Clean raw fighter rows"""
         # Log column names
         logger.info(f"Fighter columns: {fighters_df.columns.tolist()}")
         
@@ -197,8 +233,10 @@ class DataLoader:
     
     def load_fights(self):
         """Load and clean fight data from database"""
-        fights_df = self.fetch_all_data("fighter_last_5_fights")
-        
+        return self._clean_fights(self.fetch_all_data("fighter_last_5_fights"))
+    
+    def _clean_fights(self, fights_df):
+        """Clean raw fight rows"""
         # Log column names
         logger.info(f"Fight columns: {fights_df.columns.tolist()}")
         
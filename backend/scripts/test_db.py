@@ -51,6 +51,7 @@ def test_database():
         test_fighter = "Israel Adesanya"
         logger.info(f"Testing fighter search for: {test_fighter}")
         # Use ilike for case-insensitive search on the 'fighter_name' column
+        # (served by the idx_fighters_name_trgm GIN index, see ZOCRATIC_ODDS_SYSTEM.md)
         response = client.table('fighters').select('*').ilike('fighter_name', f"%{test_fighter}%").limit(1).execute()
 
         if response.data:
@@ -14,7 +14,11 @@ import os
 import sys
 import logging
 import asyncio
-from datetime import datetime, timedelta
+import atexit
+import functools
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from datetime import date, timedelta
 from pathlib import Path
 
 # Add the backend directory to the Python path
@@ -22,71 +26,90 @@ backend_dir = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(backend_dir))
 
 # Set up logging
+# Create logs directory if it doesn't exist (the file handler opens it right away)
+log_dir = backend_dir / 'logs'
+log_dir.mkdir(exist_ok=True)
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# File writes happen on a background listener thread; logging calls only enqueue
+file_handler = logging.FileHandler(log_dir / 'weekly_reminder.log', mode='a')
+file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+log_queue = queue.Queue(-1)
+queue_handler = QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter('%(message)s')) # File handler adds the full format
+log_listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop) # Drains the queue and flushes the file on exit
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
         logging.StreamHandler(),
-        logging.FileHandler(backend_dir / 'logs' / 'weekly_reminder.log', mode='a')
+        queue_handler
     ]
 )
 logger = logging.getLogger(__name__)
 
+# Sends overlap, but stay under Resend's rate limit
+MAX_CONCURRENT_SENDS = 5
+MAX_SENDS_PER_SECOND = 10
+
+@functools.lru_cache(maxsize=1)
+def get_client():
+    """Get the Supabase client once and share it between the queries of this run"""
+    from backend.api.database import get_db_connection
+    return get_db_connection()
+
 async def get_users_with_email_notifications():
     """Get all users who have email notifications enabled"""
     try:
-        from backend.api.database import get_db_connection
-        
-        supabase = get_db_connection()
+        supabase = get_client()
         if not supabase:
             logger.error("Failed to get database connection")
             return []
         
-        # Query users with email notifications enabled
+        # Query only users with an email who opted into both email notifications
+        # and weekly reminders; the JSONB filters run in Postgres, not here
         result = supabase.table('user_settings')\
-            .select('user_id, settings')\
+            .select('user_id, email:settings->>email, username:settings->>preferred_username')\
+            .eq('settings->>email_notifications', 'true')\
+            .eq('settings->>weekly_reminders', 'true')\
+            .not_.is_('settings->>email', 'null')\
+            .neq('settings->>email', '')\
             .execute()
         
         if not result.data:
-            logger.warning("No user settings found")
+            logger.warning("No users with email notifications enabled")
             return []
         
-        users_with_emails = []
-        for user in result.data:
-            settings = user.get('settings', {})
-            
-            # Check if user wants weekly reminders and email notifications
-            email_notifications = settings.get('email_notifications', False)
-            weekly_reminders = settings.get('weekly_reminders', False)
-            email = settings.get('email')
-            preferred_username = settings.get('preferred_username', 'Fighter')
-            
-            if email and email_notifications and weekly_reminders:
-                users_with_emails.append({
-                    'user_id': user['user_id'],
-                    'email': email,
-                    'username': preferred_username
-                })
-        
-        logger.info(f"Found {len(users_with_emails)} users with email notifications enabled")
+        users_with_emails = [
+            {
+                'user_id': user['user_id'],
+                'email': user['email'],
+                'username': user.get('username') or 'Fighter'
+            }
+            for user in result.data
+        ]
+        
+        logger.info("Found %d users with email notifications enabled", len(users_with_emails))
         return users_with_emails
         
     except Exception as e:
-        logger.error(f"Error fetching users with email notifications: {str(e)}")
+        logger.error("Error fetching users with email notifications: %s", e)
         return []
 
 async def get_upcoming_events():
     """Get upcoming UFC events for the next 2 weeks"""
     try:
-        from backend.api.database import get_db_connection
-        
-        supabase = get_db_connection()
+        supabase = get_client()
         if not supabase:
             logger.error("Failed to get database connection")
             return []
         
         # Get events in the next 14 days
-        today = datetime.now().date()
+        today = date.today()
         two_weeks_later = today + timedelta(days=14)
         
         result = supabase.table('upcoming_events')\
@@ -98,14 +121,14 @@ async def get_upcoming_events():
             .execute()
         
         if result.data:
-            logger.info(f"Found {len(result.data)} upcoming events")
+            logger.info("Found %d upcoming events", len(result.data))
             return result.data
         else:
             logger.info("No upcoming events found")
             return []
             
     except Exception as e:
-        logger.error(f"Error fetching upcoming events: {str(e)}")
+        logger.error("Error fetching upcoming events: %s", e)
         return []
 
 async def send_weekly_reminders():
@@ -124,42 +147,59 @@ async def send_weekly_reminders():
         from backend.api.email.services.resend_service import get_email_service
         email_service = get_email_service()
         
-        # Send emails
-        successful_sends = 0
-        failed_sends = 0
-        
-        for user in users:
-            try:
-                result = await email_service.send_weekly_picks_reminder(
+        # The events block is identical for every recipient, so render it once
+        from backend.api.email.templates.weekly_reminder_template import get_weekly_reminder_events_html
+        events_html = get_weekly_reminder_events_html(upcoming_events)
+        
+        # Send emails concurrently; the semaphore bounds in-flight requests and
+        # each send claims the next start slot so the per-second cap holds
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SENDS)
+        send_interval = 1.0 / MAX_SENDS_PER_SECOND
+        loop = asyncio.get_running_loop()
+        next_send_at = loop.time()
+        
+        async def send_one(user):
+            nonlocal next_send_at
+            async with semaphore:
+                start_at = max(next_send_at, loop.time())
+                next_send_at = start_at + send_interval
+                await asyncio.sleep(start_at - loop.time())
+                # The Resend SDK is blocking, so run it off the event loop
+                return await asyncio.to_thread(
+                    email_service.send_weekly_picks_reminder,
                     to=user['email'],
                     username=user['username'],
-                    upcoming_events=upcoming_events
+                    upcoming_events=upcoming_events,
+                    events_html=events_html
                 )
-                
-                if result.get('success'):
-                    successful_sends += 1
-                    logger.info(f"✅ Sent weekly reminder to {user['email']}")
-                else:
-                    failed_sends += 1
-                    logger.error(f"❌ Failed to send to {user['email']}: {result.get('error')}")
-                
-                # Small delay between emails to avoid rate limiting
-                await asyncio.sleep(0.1)
-                
-            except Exception as e:
+        
+        results = await asyncio.gather(*(send_one(user) for user in users), return_exceptions=True)
+        
+        successful_sends = 0
+        failed_sends = 0
+        
+        for user, result in zip(users, results):
+            if isinstance(result, Exception):
                 failed_sends += 1
-                logger.error(f"❌ Exception sending to {user['email']}: {str(e)}")
+                logger.error("❌ Exception sending to %s: %s", user['email'], result)
+            elif result.get('success'):
+                successful_sends += 1
+                logger.info("✅ Sent weekly reminder to %s", user['email'])
+            else:
+                failed_sends += 1
+                logger.error("❌ Failed to send to %s: %s", user['email'], result.get('error'))
         
         # Log summary
         total_users = len(users)
-        logger.info(f"""
+        success_rate = successful_sends / total_users * 100
+        logger.info("""
 📊 Weekly Reminder Summary:
-   Total Users: {total_users}
-   Successful Sends: {successful_sends}
-   Failed Sends: {failed_sends}
-   Success Rate: {(successful_sends/total_users*100):.1f}%
-   Upcoming Events: {len(upcoming_events)}
-""")
+   Total Users: %d
+   Successful Sends: %d
+   Failed Sends: %d
+   Success Rate: %.1f%%
+   Upcoming Events: %d
+""", total_users, successful_sends, failed_sends, success_rate, len(upcoming_events))
         
         return {
             'total_users': total_users,
@@ -169,7 +209,7 @@ async def send_weekly_reminders():
         }
         
     except Exception as e:
-        logger.error(f"Error in send_weekly_reminders: {str(e)}")
+        logger.error("Error in send_weekly_reminders: %s", e)
         raise
 
 async def main():
@@ -178,9 +218,9 @@ async def main():
     
     try:
         # Check if it's Thursday (weekday 3)
-        today = datetime.now()
+        today = date.today()
         if today.weekday() != 3:  # 0=Monday, 3=Thursday
-            logger.warning(f"Today is {today.strftime('%A')}, not Thursday. Running anyway...")
+            logger.warning("Today is %s, not Thursday. Running anyway...", today.strftime('%A'))
         
         # Check environment variables
         resend_key = os.getenv('RESEND_API_KEY')
@@ -195,14 +235,10 @@ async def main():
         return True
         
     except Exception as e:
-        logger.error(f"❌ Weekly reminder job failed: {str(e)}")
+        logger.error("❌ Weekly reminder job failed: %s", e)
         return False
 
 if __name__ == "__main__":
-    # Create logs directory if it doesn't exist
-    log_dir = Path(__file__).resolve().parent.parent / 'logs'
-    log_dir.mkdir(exist_ok=True)
-    
     # Run the main function
     success = asyncio.run(main())
     
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
-import requests
+import asyncio
+import httpx
 import json
 import sys
 import os
@@ -10,6 +11,9 @@ from datetime import datetime
 BASE_URL = "http://localhost:8000"  # Adjust if your backend runs on a different port
 API_BASE = f"{BASE_URL}/api/v1"
 
+# Pretty-print every response body with --verbose; otherwise only failures are dumped
+VERBOSE = '--verbose' in sys.argv
+
 # Test data from current active event
 EVENT_ID = 5
 FIGHT_ID = "fight_1"
@@ -33,7 +37,10 @@ def test_headers():
     }
 
 def print_response(response, endpoint_name):
-    """Pretty print response"""
+    """Pretty print response (one-line summary for successes unless --verbose)"""
+    if not VERBOSE and response.status_code < 400:
+        print(f"{endpoint_name}: {response.status_code} ({len(response.content)} bytes)")
+        return
     print(f"\n{'='*60}")
     print(f"Testing: {endpoint_name}")
     print(f"Status Code: {response.status_code}")
@@ -44,17 +51,17 @@ def print_response(response, endpoint_name):
         print(response.text)
     print(f"{'='*60}")
 
-def test_health_check():
+async def test_health_check(client):
     """Test the predictions game health endpoint"""
     url = f"{API_BASE}/predictions-game/health"
-    response = requests.get(url)
+    response = await client.get(url)
     print_response(response, "Health Check")
     return response.status_code == 200
 
-def test_get_balance():
+async def test_get_balance(client):
     """Test getting user's coin balance"""
     url = f"{API_BASE}/predictions-game/balance"
-    response = requests.get(url, headers=test_headers())
+    response = await client.get(url, headers=test_headers())
     print_response(response, "Get Coin Balance")
     
     if response.status_code == 200:
@@ -63,7 +70,7 @@ def test_get_balance():
         return True
     return False
 
-def test_place_pick():
+async def test_place_pick(client):
     """Test placing a prediction pick"""
     url = f"{API_BASE}/predictions-game/place-pick"
     
@@ -77,46 +84,46 @@ def test_place_pick():
         "odds_american": FIGHTER1_ODDS
     }
     
-    response = requests.post(url, json=pick_data, headers=test_headers())
+    response = await client.post(url, json=pick_data, headers=test_headers())
     print_response(response, f"Place Pick on {FIGHTER1_NAME}")
     
     return response.status_code == 200
 
-def test_get_my_picks():
+async def test_get_my_picks(client):
     """Test getting user's picks"""
     url = f"{API_BASE}/predictions-game/my-picks"
-    response = requests.get(url, headers=test_headers())
+    response = await client.get(url, headers=test_headers())
     print_response(response, "Get My Picks (All)")
     
     # Test filtering by event
     url_filtered = f"{API_BASE}/predictions-game/my-picks?event_id={EVENT_ID}"
-    response_filtered = requests.get(url_filtered, headers=test_headers())
+    response_filtered = await client.get(url_filtered, headers=test_headers())
     print_response(response_filtered, f"Get My Picks (Event {EVENT_ID})")
     
     return response.status_code == 200
 
-def test_get_transaction_history():
+async def test_get_transaction_history(client):
     """Test getting transaction history"""
     url = f"{API_BASE}/predictions-game/transaction-history"
-    response = requests.get(url, headers=test_headers())
+    response = await client.get(url, headers=test_headers())
     print_response(response, "Get Transaction History")
     
     return response.status_code == 200
 
-def test_get_event_pick_stats():
+async def test_get_event_pick_stats(client):
     """Test getting event pick statistics"""
     url = f"{API_BASE}/predictions-game/event-picks/{EVENT_ID}"
-    response = requests.get(url, headers=test_headers())
+    response = await client.get(url, headers=test_headers())
     print_response(response, f"Get Event Pick Stats (Event {EVENT_ID})")
     
     return response.status_code == 200
 
-def test_place_multiple_picks():
+async def test_place_multiple_picks(client):
     """Test placing picks on multiple fighters"""
     url = f"{API_BASE}/predictions-game/place-pick"
     
     # Get current balance first
-    balance_response = requests.get(f"{API_BASE}/predictions-game/balance", headers=test_headers())
+    balance_response = await client.get(f"{API_BASE}/predictions-game/balance", headers=test_headers())
     if balance_response.status_code != 200:
         print("Could not get balance for multiple picks test")
         return False
@@ -138,7 +145,7 @@ def test_place_multiple_picks():
         "odds_american": FIGHTER2_ODDS
     }
     
-    response2 = requests.post(url, json=pick_data_2, headers=test_headers())
+    response2 = await client.post(url, json=pick_data_2, headers=test_headers())
     print_response(response2, f"Place Pick on {FIGHTER2_NAME}")
     
     # Note: This should fail since you can only pick one fighter per fight
@@ -146,7 +153,7 @@ def test_place_multiple_picks():
     
     return True
 
-def test_invalid_scenarios():
+async def test_invalid_scenarios(client):
     """Test various invalid scenarios"""
     url = f"{API_BASE}/predictions-game/place-pick"
     
@@ -160,7 +167,7 @@ def test_invalid_scenarios():
         "odds_american": FIGHTER1_ODDS
     }
     
-    response1 = requests.post(url, json=invalid_pick_1, headers=test_headers())
+    response1 = await client.post(url, json=invalid_pick_1, headers=test_headers())
     print_response(response1, "Invalid Pick - Zero Stake")
     
     # Test 2: Missing required fields
@@ -170,7 +177,7 @@ def test_invalid_scenarios():
         # Missing fighter_id, fighter_name, stake, odds_american
     }
     
-    response2 = requests.post(url, json=invalid_pick_2, headers=test_headers())
+    response2 = await client.post(url, json=invalid_pick_2, headers=test_headers())
     print_response(response2, "Invalid Pick - Missing Fields")
     
     # Test 3: Non-existent event
@@ -183,19 +190,19 @@ def test_invalid_scenarios():
         "odds_american": FIGHTER1_ODDS
     }
     
-    response3 = requests.post(url, json=invalid_pick_3, headers=test_headers())
+    response3 = await client.post(url, json=invalid_pick_3, headers=test_headers())
     print_response(response3, "Invalid Pick - Non-existent Event")
     
     return True
 
-def test_no_auth():
+async def test_no_auth(client):
     """Test endpoints without authentication"""
     print(f"\n{'='*60}")
     print("Testing: Endpoints without authentication")
     
     # Test balance without auth
     url = f"{API_BASE}/predictions-game/balance"
-    response = requests.get(url)  # No auth headers
+    response = await client.get(url)  # No auth headers
     print(f"Balance without auth - Status: {response.status_code}")
     
     # Test place pick without auth
@@ -208,13 +215,23 @@ def test_no_auth():
         "stake": 100,
         "odds_american": FIGHTER1_ODDS
     }
-    response = requests.post(url, json=pick_data)  # No auth headers
+    response = await client.post(url, json=pick_data)  # No auth headers
     print(f"Place pick without auth - Status: {response.status_code}")
     
     print(f"{'='*60}")
     return True
 
-def main():
+async def run_test(client, test_name, test_func):
+    """Run a single test, recording a failure if it raises"""
+    try:
+        result = await test_func(client)
+        print(f"✅ {test_name}: {'PASSED' if result else 'FAILED'}")
+        return (test_name, result)
+    except Exception as e:
+        print(f"❌ {test_name}: FAILED with exception: {e}")
+        return (test_name, False)
+
+async def main():
     """Run all tests"""
     print("Starting Predictions Game API Tests")
     print(f"Base URL: {BASE_URL}")
@@ -222,41 +239,42 @@ def main():
     print(f"Test Fight: {FIGHTER1_NAME} vs {FIGHTER2_NAME}")
     print(f"Test User ID: {TEST_USER_ID}")
     
-    # Check if backend is running
-    try:
-        response = requests.get(f"{BASE_URL}/health", timeout=5)
-        if response.status_code != 200:
-            print(f"❌ Backend health check failed: {response.status_code}")
-            return False
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Cannot connect to backend at {BASE_URL}: {e}")
-        print("Make sure your FastAPI backend is running!")
-        return False
-    
-    print("✅ Backend is running")
-    
-    # Run tests
-    tests = [
-        ("Health Check", test_health_check),
-        ("Get Balance", test_get_balance),
-        ("Place Pick", test_place_pick),
-        ("Get My Picks", test_get_my_picks),
-        ("Get Transaction History", test_get_transaction_history),
-        ("Get Event Pick Stats", test_get_event_pick_stats),
-        ("Place Multiple Picks", test_place_multiple_picks),
-        ("Invalid Scenarios", test_invalid_scenarios),
-        ("No Auth Tests", test_no_auth),
-    ]
-    
-    results = []
-    for test_name, test_func in tests:
+    # One keep-alive client for the whole run instead of a new connection per request.
+    # No client-wide timeout: like the requests calls it replaced, only the health probe is bounded
+    async with httpx.AsyncClient(timeout=None) as client:
+        # Check if backend is running
         try:
-            result = test_func()
-            results.append((test_name, result))
-            print(f"✅ {test_name}: {'PASSED' if result else 'FAILED'}")
-        except Exception as e:
-            results.append((test_name, False))
-            print(f"❌ {test_name}: FAILED with exception: {e}")
+            response = await client.get(f"{BASE_URL}/health", timeout=5)
+            if response.status_code != 200:
+                print(f"❌ Backend health check failed: {response.status_code}")
+                return False
+        except httpx.HTTPError as e:
+            print(f"❌ Cannot connect to backend at {BASE_URL}: {e}")
+            print("Make sure your FastAPI backend is running!")
+            return False
+        
+        print("✅ Backend is running")
+        
+        # Run tests in stages: read-only tests within a stage run concurrently,
+        # while tests that place picks run on their own, in order
+        stages = [
+            [("Health Check", test_health_check), ("Get Balance", test_get_balance)],
+            [("Place Pick", test_place_pick)],
+            [
+                ("Get My Picks", test_get_my_picks),
+                ("Get Transaction History", test_get_transaction_history),
+                ("Get Event Pick Stats", test_get_event_pick_stats),
+            ],
+            [("Place Multiple Picks", test_place_multiple_picks)],
+            [("Invalid Scenarios", test_invalid_scenarios)],
+            [("No Auth Tests", test_no_auth)],
+        ]
+        
+        results = []
+        for stage in stages:
+            results.extend(await asyncio.gather(
+                *(run_test(client, test_name, test_func) for test_name, test_func in stage)
+            ))
     
     # Summary
     print(f"\n{'='*60}")
@@ -279,5 +297,5 @@ def main():
     return passed == total
 
 if __name__ == "__main__":
-    success = main()
+    success = asyncio.run(main())
     sys.exit(0 if success else 1) 
\ No newline at end of file
@@ -2,11 +2,19 @@
 Utility functions used across the application.
 """
 from typing import Any, Dict, List, Union, Optional
+import functools
 import logging
-from datetime import datetime
+import re
+from datetime import date, datetime
 
 logger = logging.getLogger(__name__)
 
+_MONTH_NAMES = ('January', 'February', 'March', 'April', 'May', 'June', 'July',
+                'August', 'September', 'October', 'November', 'December')
+
+# Everything except digits, decimal point and negative sign
+_NON_NUMERIC_RE = re.compile(r'[^0-9.\-]')
+
 def parse_float(value: Any) -> float:
     """
     Safely parse a value to float.
@@ -20,7 +28,7 @@ def parse_float(value: Any) -> float:
     try:
         if isinstance(value, str):
             # Remove any non-numeric characters except decimal point and negative sign
-            clean_value = ''.join(c for c in value if c.isdigit() or c in '.-')
+            clean_value = _NON_NUMERIC_RE.sub('', value)
             return float(clean_value) if clean_value else 0.0
         return float(value) if value is not None else 0.0
     except (ValueError, TypeError):
@@ -36,15 +44,10 @@ def parse_percentage(value: Any) -> float:
     Returns:
         float: The percentage as a float between 0 and 100
     """
-    try:
-        if isinstance(value, str):
-            # Remove the % symbol and any whitespace
-            clean_value = value.strip().rstrip('%')
-            return parse_float(clean_value)
-        return parse_float(value)
-    except (ValueError, TypeError):
-        return 0.0
+    # parse_float already drops the % symbol and any whitespace
+    return parse_float(value)
 
+@functools.lru_cache(maxsize=4096)
 def format_date(date_str: Optional[str]) -> str:
     """
     Format a date string to a consistent format.
@@ -58,43 +61,125 @@ def format_date(date_str: Optional[str]) -> str:
     if not date_str:
         return ""
     try:
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-        return date_obj.strftime("%B %d, %Y")
+        date_obj = None
+        # Fast path only for the zero-padded "YYYY-MM-DD" shape: fromisoformat would also take
+        # "20240105" or "2024-W01-1", which strptime rejects and we return unchanged
+        if len(date_str) == 10 and date_str[4] == date_str[7] == '-':
+            try:
+                date_obj = date.fromisoformat(date_str)
+            except ValueError:
+                pass # strptime also takes e.g. "2024-01- 5" or non-ASCII digits
+        if date_obj is None:
+            date_obj = datetime.strptime(date_str, "%Y-%m-%d")
     except (ValueError, TypeError):
-        return date_str if date_str else ""
+        return date_str
+    return f"{_MONTH_NAMES[date_obj.month - 1]} {date_obj.day:02d}, {date_obj.year}"
+
+# Placeholder strings that should reach the client as empty values
+_EMPTY_SENTINELS = frozenset(("null", "undefined", "none", "nan"))
+_EMPTY_SENTINEL_MAX_LEN = max(map(len, _EMPTY_SENTINELS))
+
+def _sanitize_str(value: str) -> str:
+    value = value.strip()
+    # Length check first so long strings never pay for lower()
+    if len(value) <= _EMPTY_SENTINEL_MAX_LEN and value.lower() in _EMPTY_SENTINELS:
+        return ""
+    return value
+
+def _sanitize_other(value: Any) -> Any:
+    """Fallback for leaf types missing from the dispatch table (subclasses, numpy scalars, ...)."""
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, str):
+        return _sanitize_str(value)
+    return str(value)
+
+# Shared strings for the small ints (counts, rounds, ranks) that dominate payloads
+_SMALL_INT_MIN, _SMALL_INT_MAX = -128, 256
+_SMALL_INT_STR = tuple(str(i) for i in range(_SMALL_INT_MIN, _SMALL_INT_MAX + 1))
+
+def _sanitize_int(value: int) -> str:
+    if _SMALL_INT_MIN <= value <= _SMALL_INT_MAX:
+        return _SMALL_INT_STR[value - _SMALL_INT_MIN]
+    return str(value)
+
+# Exact-type dispatch for leaf values; bools stringify like ints ("True"/"False")
+_LEAF_HANDLERS = {
+    type(None): lambda value: "",
+    int: _sanitize_int,
+    float: str,
+    bool: str,
+    str: _sanitize_str,
+}
+
+# Stack marker that closes a container's walk in sanitize_value
+_EXIT = object()
 
 def sanitize_value(value: Any) -> Any:
     """
     Sanitize a single value to prevent client-side errors.
     
+    Nested dicts and lists are walked with an explicit stack rather than
+    recursion, so deep payloads cannot hit the recursion limit. A container
+    that contains itself raises ValueError, as json.dumps does.
+    
     Args:
         value: Any value that needs sanitization
         
     Returns:
         Any: The sanitized value
     """
-    if value is None:
-        return ""
+    handler = _LEAF_HANDLERS.get(type(value))
+    if handler is not None:
+        return handler(value)
     
-    if isinstance(value, (int, float)):
-        return str(value)
-    
-    if isinstance(value, bool):
-        return str(value).lower()
-    
-    if isinstance(value, str):
-        value = value.strip()
-        if value.lower() in ("null", "undefined", "none", "nan"):
-            return ""
-        return value
-    
-    if isinstance(value, (list, tuple)):
-        return [sanitize_value(item) for item in value]
-    
-    if isinstance(value, dict):
-        return {k: sanitize_value(v) for k, v in value.items()}
-    
-    return str(value)
+    # Bound-method locals: this loop runs once per container node
+    get_handler = _LEAF_HANDLERS.get
+    root = [None]
+    stack = [(root, 0, value)]
+    pop, push = stack.pop, stack.append
+    # ids of the containers on the current path; each one is pushed with an exit
+    # marker beneath its children so it leaves the set once they are all done
+    active = set()
+    while stack:
+        parent, key, item = pop()
+        if parent is _EXIT:
+            active.discard(key)
+            continue
+        handler = get_handler(type(item))
+        if handler is not None:
+            parent[key] = handler(item)
+            continue
+        if not isinstance(item, (dict, list, tuple)):
+            parent[key] = _sanitize_other(item)
+            continue
+        item_id = id(item)
+        if item_id in active:
+            raise ValueError("Circular reference detected")
+        active.add(item_id)
+        push((_EXIT, item_id, None))
+        if isinstance(item, dict):
+            # Leaves are sanitized inline; only nested containers go on the stack,
+            # behind a placeholder so the original key order is kept
+            sanitized = {}
+            for k, v in item.items():
+                handler = get_handler(type(v))
+                if handler is not None:
+                    sanitized[k] = handler(v)
+                else:
+                    sanitized[k] = None
+                    push((sanitized, k, v))
+            parent[key] = sanitized
+        else:
+            sanitized = [None] * len(item)
+            for i, v in enumerate(item):
+                handler = get_handler(type(v))
+                if handler is not None:
+                    sanitized[i] = handler(v)
+                else:
+                    push((sanitized, i, v))
+            parent[key] = sanitized
+    return root[0]
 
 def sanitize_json(data: Any) -> Any:
     """
@@ -112,6 +197,7 @@ def sanitize_json(data: Any) -> Any:
         logger.error(f"Error sanitizing JSON: {str(e)}")
         return data
 
+@functools.lru_cache(maxsize=4096)
 def clean_fighter_name(name: str) -> str:
     """
     Clean a fighter name by removing special characters and extra whitespace.
@@ -132,6 +218,7 @@ def clean_fighter_name(name: str) -> str:
         logger.error(f"Error cleaning fighter name: {str(e)}")
         return name
 
+@functools.lru_cache(maxsize=4096)
 def parse_record(record: str) -> tuple[int, int, int]:
     """
     Parse a fighter's record string into wins, losses, and draws.
@@ -142,23 +229,24 @@ def parse_record(record: str) -> tuple[int, int, int]:
     Returns:
         tuple[int, int, int]: A tuple of (wins, losses, draws)
     """
+    if not record or not isinstance(record, str):
+        return (0, 0, 0)
+    
+    parts = record.split('-', 2)
+    if len(parts) != 3:
+        return (0, 0, 0)
+    
+    # More than two dashes ("1-2-3-4") is not a record
+    if '-' in parts[2]:
+        return (0, 0, 0)
+    
     try:
-        if not record or not isinstance(record, str):
-            return (0, 0, 0)
-        
-        parts = record.split('-')
-        if len(parts) != 3:
-            return (0, 0, 0)
-        
+        # Parts that are not purely digits (" 1", "0 (1 NC)") count as zero
         wins = int(parts[0]) if parts[0].isdigit() else 0
         losses = int(parts[1]) if parts[1].isdigit() else 0
         draws = int(parts[2]) if parts[2].isdigit() else 0
-        
         return (wins, losses, draws)
-    except Exception as e:
+    except ValueError as e:
+        # isdigit() also accepts characters int() rejects, such as superscripts
         logger.error(f"Error parsing record: {str(e)}")
         return (0, 0, 0)
-
-def set_parent_key(key):
-    """Set the current parent key for context in nested sanitization."""
-    sanitize_json.current_key = key 
\ No newline at end of file
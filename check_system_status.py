@@ -5,6 +5,7 @@ Quick script to check UFC automation system status
 import sys
 import os
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # Add project root to path
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__))))
@@ -13,12 +14,26 @@ try:
     from backend.api.database import get_supabase_client
     supabase = get_supabase_client()
     
+    # The three status lookups are independent, so issue them together
+    # and pay one round-trip of latency instead of three
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        active_future = executor.submit(
+            supabase.table('upcoming_events')
+            .select('event_name, event_date, status, completed_fights, total_fights, results_updated_at, event_url')
+            .eq('is_active', True).execute
+        )
+        recent_future = executor.submit(
+            supabase.table('upcoming_events')
+            .select('event_name, status, is_active, scraped_at')
+            .order('scraped_at', desc=True).limit(5).execute
+        )
+        bucket_future = executor.submit(supabase.storage.from_('fight-events').list)
+    
     print("🏟️  UFC AUTOMATION SYSTEM STATUS")
     print("=" * 50)
     
     # Check active events
-    response = supabase.table('upcoming_events').select('*').eq('is_active', True).execute()
-    active_events = response.data
+    active_events = active_future.result().data
     
     if active_events:
         event = active_events[0]
@@ -35,8 +50,7 @@ try:
     print("-" * 30)
     
     # Check recent events (last 5)
-    recent_response = supabase.table('upcoming_events').select('*').order('scraped_at', desc=True).limit(5).execute()
-    recent_events = recent_response.data
+    recent_events = recent_future.result().data
     
     for i, event in enumerate(recent_events, 1):
         status_icon = "🟢" if event['is_active'] else "🔴"
@@ -47,7 +61,7 @@ try:
     
     # Check if storage bucket has historical events
     try:
-        bucket_response = supabase.storage.from_('fight-events').list()
+        bucket_response = bucket_future.result()
         if bucket_response:
             print(f"📦 HISTORICAL EVENTS IN BUCKET: {len(bucket_response)}")
         else:
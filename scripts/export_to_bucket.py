@@ -1,10 +1,16 @@
+import gzip
+import io
 import json
 import os
+import re
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from functools import lru_cache
 from dotenv import load_dotenv
 import argparse
+import copy
 
 # Add project root to path
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
@@ -12,6 +18,19 @@ sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'
 # Load environment variables
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '../.env'))
 
+try:
+    import orjson
+    orjson_available = True
+except ImportError:
+    orjson_available = False
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    boto3_available = True
+except ImportError:
+    boto3_available = False
+
 # Setup logging
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -30,55 +49,105 @@ except Exception as e:
     logger.error(f"Error connecting to database: {str(e)}")
     sys.exit(1)
 
+# Bucket uploads are latency-bound HTTPS PUTs, so several run at once
+MAX_UPLOAD_WORKERS = 8
+# Gzipped exports larger than this go through Supabase's S3 endpoint as parallel multipart
+# uploads; anything smaller is a single request
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+# Completed events carry the full fights JSON, so they are fetched a page at a time
+COMPLETED_EVENTS_PAGE_SIZE = 50
+# Only the columns prepare_export_data, deactivation and the page cursor read
+COMPLETED_EVENT_COLUMNS = (
+    'id,event_name,event_date,event_url,status,total_fights,completed_fights,'
+    'scraped_at,results_updated_at,fights'
+)
+
+_EVENT_ID_STRIP_RE = re.compile(r'[^a-z0-9\-]')
+_EVENT_ID_TRANS = str.maketrans({":": None, " ": "-"})
+
+@lru_cache(maxsize=1024)
 def generate_event_id(event_name):
     """Generate a clean event ID from event name"""
-    # Convert to lowercase, replace spaces with hyphens, remove special chars
-    event_id = event_name.lower()
-    event_id = event_id.replace(":", "")
-    event_id = event_id.replace(" ", "-")
+    # Convert to lowercase, drop colons and turn spaces into hyphens in one translate pass
+    event_id = event_name.lower().translate(_EVENT_ID_TRANS)
     event_id = event_id.replace("--", "-")
     
-    # Remove any remaining special characters except hyphens
-    import re
-    event_id = re.sub(r'[^a-z0-9\-]', '', event_id)
+    # Remove any remaining special characters except hyphens; this must stay after the
+    # "--" collapse so IDs match fight_results_scraper and the files already in the bucket
+    event_id = _EVENT_ID_STRIP_RE.sub('', event_id)
     
     return event_id
 
+_ZERO_STATS = {
+    "total_fights": 0,
+    "completed_fights": 0,
+    "correct_predictions": 0,
+    "accuracy_percentage": 0.0,
+    "by_confidence": {
+        "high_confidence": {"count": 0, "accuracy": 0.0},
+        "medium_confidence": {"count": 0, "accuracy": 0.0},
+        "low_confidence": {"count": 0, "accuracy": 0.0}
+    }
+}
+
 def calculate_accuracy_stats(fights):
     """Calculate prediction accuracy statistics for the event"""
     total_fights = len(fights)
-    completed_fights = sum(1 for f in fights if f.get("status") == "completed")
-    correct_predictions = sum(1 for f in fights if f.get("prediction_correct") is True)
+    if not total_fights:
+        return {**copy.deepcopy(_ZERO_STATS), "calculated_at": datetime.now().isoformat()}
     
-    accuracy_percentage = (correct_predictions / completed_fights * 100) if completed_fights > 0 else 0
+    # One pass over the fights fills every counter; bucket 0 is high (>75), 1 medium (60-75), 2 low (<60)
+    bucket_counts = [0, 0, 0]
+    bucket_completed = [0, 0, 0]
+    bucket_correct = [0, 0, 0]
+    completed_fights = 0
+    correct_predictions = 0
+    
+    for f in fights:
+        # Overall accuracy counts correct predictions of any status, bucket accuracy only completed ones
+        is_correct = f.get("prediction_correct") is True
+        is_completed = f.get("status") == "completed"
+        correct_predictions += is_correct
+        completed_fights += is_completed
+        
+        confidence = f.get("prediction", {}).get("confidence_percent", 0)
+        if confidence > 75:
+            idx = 0
+        elif 60 <= confidence <= 75:
+            idx = 1
+        elif confidence < 60:
+            idx = 2
+        else:
+            continue # NaN falls in no bucket
+        
+        bucket_counts[idx] += 1
+        if is_completed:
+            bucket_completed[idx] += 1
+            bucket_correct[idx] += is_correct
     
-    # Calculate accuracy by confidence level
-    high_confidence = [f for f in fights if f.get("prediction", {}).get("confidence_percent", 0) > 75]
-    medium_confidence = [f for f in fights if 60 <= f.get("prediction", {}).get("confidence_percent", 0) <= 75]
-    low_confidence = [f for f in fights if f.get("prediction", {}).get("confidence_percent", 0) < 60]
+    def calc_accuracy(correct_count, completed_count):
+        return round(correct_count / completed_count * 100, 2) if completed_count else 0.0
     
-    def calc_accuracy(fight_list):
-        completed = [f for f in fight_list if f.get("status") == "completed"]
-        correct = [f for f in completed if f.get("prediction_correct") is True]
-        return (len(correct) / len(completed) * 100) if completed else 0
+    overall_accuracy = calc_accuracy(correct_predictions, completed_fights)
+    high_accuracy, medium_accuracy, low_accuracy = map(calc_accuracy, bucket_correct, bucket_completed)
     
     stats = {
         "total_fights": total_fights,
         "completed_fights": completed_fights,
         "correct_predictions": correct_predictions,
-        "accuracy_percentage": round(accuracy_percentage, 2),
+        "accuracy_percentage": overall_accuracy,
         "by_confidence": {
             "high_confidence": {
-                "count": len(high_confidence),
-                "accuracy": round(calc_accuracy(high_confidence), 2)
+                "count": bucket_counts[0],
+                "accuracy": high_accuracy
             },
             "medium_confidence": {
-                "count": len(medium_confidence),
-                "accuracy": round(calc_accuracy(medium_confidence), 2)
+                "count": bucket_counts[1],
+                "accuracy": medium_accuracy
             },
             "low_confidence": {
-                "count": len(low_confidence),
-                "accuracy": round(calc_accuracy(low_confidence), 2)
+                "count": bucket_counts[2],
+                "accuracy": low_accuracy
             }
         },
         "calculated_at": datetime.now().isoformat()
@@ -108,20 +177,73 @@ def prepare_export_data(event_data):
     
     return export_data
 
+@lru_cache(maxsize=None)
+def get_bucket(bucket_name):
+    """Storage bucket proxy; every upload shares the storage client's keep-alive HTTP/2 pool"""
+    return supabase.storage.from_(bucket_name)
+
+@lru_cache(maxsize=1)
+def get_s3_client():
+    """S3 client for Supabase Storage's S3-compatible endpoint.
+    
+    Needs boto3 plus SUPABASE_S3_ACCESS_KEY_ID / SUPABASE_S3_SECRET_ACCESS_KEY (and optionally
+    SUPABASE_S3_REGION); returns None otherwise so uploads stay single-shot.
+    """
+    supabase_url = os.getenv("SUPABASE_URL")
+    access_key = os.getenv("SUPABASE_S3_ACCESS_KEY_ID")
+    secret_key = os.getenv("SUPABASE_S3_SECRET_ACCESS_KEY")
+    if not (boto3_available and supabase_url and access_key and secret_key):
+        return None
+    
+    return boto3.client(
+        's3',
+        endpoint_url=f"{supabase_url.rstrip('/')}/storage/v1/s3",
+        region_name=os.getenv("SUPABASE_S3_REGION", "us-east-1"),
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key
+    )
+
+def upload_multipart(payload, filename, bucket_name):
+    """Upload a large payload in parallel parts through the S3 endpoint"""
+    logger.info(f"Uploading {filename} ({len(payload) / (1024 * 1024):.1f} MB) to bucket '{bucket_name}' in parts...")
+    
+    get_s3_client().upload_fileobj(
+        io.BytesIO(payload),
+        bucket_name,
+        filename,
+        ExtraArgs={"ContentType": "application/json"},
+        Config=TransferConfig(
+            multipart_threshold=MULTIPART_THRESHOLD,
+            multipart_chunksize=MULTIPART_THRESHOLD,
+            max_concurrency=8
+        )
+    )
+    
+    logger.info(f"Successfully uploaded {filename} to bucket")
+    return True
+
 def upload_to_bucket(export_data, bucket_name="fight-events"):
     """Upload event data to Supabase storage bucket"""
     try:
         event_id = export_data["event_id"]
         filename = f"{event_id}_complete.json"
         
-        # Convert to JSON string
-        json_data = json.dumps(export_data, indent=2, ensure_ascii=False)
-        json_bytes = json_data.encode('utf-8')
+        # Serialize compactly and gzip. Uploads carry no content-encoding (storage would not keep it
+        # on the object); the API spots the gzip magic bytes instead. fight_results_scraper writes
+        # the same format
+        if orjson_available:
+            json_bytes = orjson.dumps(export_data, option=orjson.OPT_NON_STR_KEYS)
+        else:
+            json_bytes = json.dumps(export_data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        json_bytes = gzip.compress(json_bytes, compresslevel=6)
+        
+        if len(json_bytes) > MULTIPART_THRESHOLD and get_s3_client() is not None:
+            return upload_multipart(json_bytes, filename, bucket_name)
         
         # Upload to bucket
         logger.info(f"Uploading {filename} to bucket '{bucket_name}'...")
         
-        response = supabase.storage.from_(bucket_name).upload(
+        response = get_bucket(bucket_name).upload(
             file=json_bytes,
             path=filename,
             file_options={"content-type": "application/json", "upsert": "true"}
@@ -140,89 +262,113 @@ def upload_to_bucket(export_data, bucket_name="fight-events"):
         traceback.print_exc()
         return False
 
-def deactivate_event(event_id):
-    """Deactivate event after successful export"""
+def export_event(event, bucket_name="fight-events"):
+    """Build and upload one event's export; runs inside the upload pool"""
+    logger.info(f"Processing event: {event['event_name']}")
+    return upload_to_bucket(prepare_export_data(event), bucket_name)
+
+def deactivate_events(event_ids):
+    """Deactivate all successfully exported events with a single UPDATE"""
     try:
         response = supabase.table('upcoming_events').update({
             'is_active': False
-        }).eq('id', event_id).execute()
+        }).in_('id', event_ids).execute()
         
-        if response.data:
-            logger.info(f"Deactivated event {event_id}")
+        deactivated = len(response.data or [])
+        if deactivated == len(event_ids):
+            logger.info(f"Deactivated {deactivated} events")
             return True
         else:
-            logger.error(f"Failed to deactivate event {event_id}")
+            logger.error(f"Deactivated {deactivated} of {len(event_ids)} exported events")
             return False
             
     except Exception as e:
-        logger.error(f"Error deactivating event: {str(e)}")
+        logger.error(f"Error deactivating events: {str(e)}")
         return False
 
-def get_completed_events(days_back=7):
-    """Get completed events from the last N days"""
+def iter_completed_events(days_back=7, page_size=COMPLETED_EVENTS_PAGE_SIZE):
+    """Yield completed events from the last N days, fetched in keyset pages on (scraped_at, id)"""
     try:
         cutoff_date = (datetime.now() - timedelta(days=days_back)).isoformat()
+        last_scraped_at = last_id = None
+        found_count = 0
         
-        response = supabase.table('upcoming_events').select('*').eq('status', 'completed').gte('scraped_at', cutoff_date).execute()
+        while True:
+            query = supabase.table('upcoming_events').select(COMPLETED_EVENT_COLUMNS).eq('status', 'completed')
+            if last_scraped_at is None:
+                query = query.gte('scraped_at', cutoff_date)
+            else:
+                # Resume strictly after the last row; id breaks ties between equal timestamps
+                query = query.or_(
+                    f'scraped_at.gt."{last_scraped_at}",'
+                    f'and(scraped_at.eq."{last_scraped_at}",id.gt.{last_id})'
+                )
+            
+            rows = query.order('scraped_at').order('id').limit(page_size).execute().data or []
+            found_count += len(rows)
+            yield from rows
+            
+            if len(rows) < page_size:
+                break
+            last_scraped_at, last_id = rows[-1]['scraped_at'], rows[-1]['id']
         
-        if response.data:
-            logger.info(f"Found {len(response.data)} completed events")
-            return response.data
+        if found_count:
+            logger.info(f"Found {found_count} completed events")
         else:
             logger.info("No completed events found")
-            return []
             
     except Exception as e:
         logger.error(f"Error getting completed events: {str(e)}")
-        return []
 
 def export_completed_events(bucket_name="fight-events", days_back=7):
     """Export all completed events to bucket"""
     logger.info("Starting export of completed events to bucket...")
     
-    # Get completed events
-    completed_events = get_completed_events(days_back)
-    
-    if not completed_events:
-        logger.info("No completed events to export")
-        return True
-    
-    exported_count = 0
+    exported_ids = []
     failed_count = 0
     
-    for event in completed_events:
-        try:
-            logger.info(f"Processing event: {event['event_name']}")
-            
-            # Prepare export data
-            export_data = prepare_export_data(event)
-            
-            # Upload to bucket
-            success = upload_to_bucket(export_data, bucket_name)
-            
-            if success:
-                # Deactivate event after successful export
-                if deactivate_event(event['id']):
-                    exported_count += 1
-                    logger.info(f"Successfully exported and deactivated: {event['event_name']}")
+    # supabase.storage (and the S3 client) are created lazily; build them here so the
+    # workers don't race to create separate clients and all reuse one connection pool
+    get_bucket(bucket_name)
+    get_s3_client()
+    
+    with ThreadPoolExecutor(max_workers=MAX_UPLOAD_WORKERS) as executor:
+        # The main thread only pages through events; workers build, gzip and upload
+        # each export while later pages are still being fetched
+        futures = {
+            executor.submit(export_event, event, bucket_name): event
+            for event in iter_completed_events(days_back)
+        }
+        
+        if not futures:
+            logger.info("No completed events to export")
+            return True
+        
+        for future in as_completed(futures):
+            event = futures[future]
+            try:
+                if future.result():
+                    exported_ids.append(event['id'])
+                    logger.info(f"Successfully exported: {event['event_name']}")
                 else:
-                    logger.warning(f"Exported but failed to deactivate: {event['event_name']}")
-                    exported_count += 1
-            else:
+                    failed_count += 1
+                    logger.error(f"Failed to export: {event['event_name']}")
+                    
+            except Exception as e:
                 failed_count += 1
-                logger.error(f"Failed to export: {event['event_name']}")
-                
-        except Exception as e:
-            failed_count += 1
-            logger.error(f"Error processing event {event.get('event_name', 'Unknown')}: {str(e)}")
+                logger.error(f"Error processing event {event.get('event_name', 'Unknown')}: {str(e)}")
+    
+    # Deactivate exported events in one round-trip
+    if exported_ids and not deactivate_events(exported_ids):
+        logger.warning("Some exported events could not be deactivated")
     
-    logger.info(f"Export complete: {exported_count} exported, {failed_count} failed")
+    logger.info(f"Export complete: {len(exported_ids)} exported, {failed_count} failed")
     return failed_count == 0
 
 def list_bucket_files(bucket_name="fight-events"):
     """List files in the bucket (for debugging)"""
     try:
-        response = supabase.storage.from_(bucket_name).list()
+        response = get_bucket(bucket_name).list()
         
         if hasattr(response, 'error') and response.error:
             logger.error(f"Error listing bucket files: {response.error}")
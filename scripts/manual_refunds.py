@@ -18,7 +18,8 @@ Usage:
 import sys
 import os
 import argparse
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timezone
 import json
 
 # Add project root to path
@@ -42,7 +43,9 @@ def list_pending_bets(event_id=None, fight_id=None):
     print("\n📋 PENDING BETS ANALYSIS")
     print("=" * 50)
     
-    query = supabase.table('bets').select('*').eq('status', 'pending')
+    query = supabase.table('bets')\
+        .select('id, user_id, fight_id, fighter_id, fighter_name, stake, event_id')\
+        .eq('status', 'pending')
     
     if event_id:
         query = query.eq('event_id', event_id)
@@ -61,43 +64,38 @@ def list_pending_bets(event_id=None, fight_id=None):
     bets = response.data
     print(f"📊 Found {len(bets)} pending bets")
     
-    # Group by fight_id
-    fight_groups = {}
+    # Group by fight_id, building the fighter distribution in the same pass
+    fight_groups = defaultdict(lambda: {
+        'bet_count': 0,
+        'total_stake': 0,
+        'unique_users': set(),
+        'fighter_bets': defaultdict(lambda: {'count': 0, 'stake': 0})
+    })
     total_stake = 0
     
     for bet in bets:
-        fight_id = bet['fight_id']
-        if fight_id not in fight_groups:
-            fight_groups[fight_id] = {
-                'bets': [],
-                'total_stake': 0,
-                'unique_users': set()
-            }
+        stake = bet['stake']
+        group = fight_groups[bet['fight_id']]
+        group['bet_count'] += 1
+        group['total_stake'] += stake
+        group['unique_users'].add(bet['user_id'])
         
-        fight_groups[fight_id]['bets'].append(bet)
-        fight_groups[fight_id]['total_stake'] += bet['stake']
-        fight_groups[fight_id]['unique_users'].add(bet['user_id'])
-        total_stake += bet['stake']
+        fighter_stats = group['fighter_bets'][bet['fighter_name']]
+        fighter_stats['count'] += 1
+        fighter_stats['stake'] += stake
+        total_stake += stake
     
     print(f"\n💰 Total stake at risk: {total_stake} coins")
     print(f"🥊 Fights with pending bets: {len(fight_groups)}")
     
     for fight_id, data in fight_groups.items():
         print(f"\n  Fight {fight_id}:")
-        print(f"    Bets: {len(data['bets'])}")
+        print(f"    Bets: {data['bet_count']}")
         print(f"    Unique users: {len(data['unique_users'])}")
         print(f"    Total stake: {data['total_stake']} coins")
         
         # Show fighter distribution
-        fighter_bets = {}
-        for bet in data['bets']:
-            fighter = bet['fighter_name']
-            if fighter not in fighter_bets:
-                fighter_bets[fighter] = {'count': 0, 'stake': 0}
-            fighter_bets[fighter]['count'] += 1
-            fighter_bets[fighter]['stake'] += bet['stake']
-        
-        for fighter, stats in fighter_bets.items():
+        for fighter, stats in data['fighter_bets'].items():
             print(f"      {fighter}: {stats['count']} bets, {stats['stake']} coins")
     
     return bets
@@ -114,7 +112,7 @@ def process_emergency_refund(fight_id, reason, refund_type='full_refund', dry_ru
     
     # Get pending bets for this fight
     response = supabase.table('bets')\
-        .select('*')\
+        .select('id, user_id, fighter_name, stake')\
         .eq('fight_id', fight_id)\
         .eq('status', 'pending')\
         .execute()
@@ -135,8 +133,8 @@ def process_emergency_refund(fight_id, reason, refund_type='full_refund', dry_ru
         total_refund_amount += refund_amount
         unique_users.add(bet['user_id'])
         
-        print(f"  📝 Bet {bet['id']}: User {bet['user_id']}, Fighter: {bet['fighter_name']}")
-        print(f"      Stake: {stake} → Refund: {refund_amount} coins")
+        print(f"  📝 Bet {bet['id']}: User {bet['user_id']}, Fighter: {bet['fighter_name']}\n"
+              f"      Stake: {stake} → Refund: {refund_amount} coins")
     
     print(f"\n💰 Total refund amount: {total_refund_amount} coins")
     print(f"👥 Affected users: {len(unique_users)}")
@@ -154,47 +152,87 @@ def process_emergency_refund(fight_id, reason, refund_type='full_refund', dry_ru
     # Process refunds
     print("\n🔄 Processing refunds...")
     successful_refunds = 0
+    current_timestamp = datetime.now(timezone.utc).isoformat()
+    refund_reason = f'MANUAL REFUND: {reason}'
     
+    # Bets are updated grouped by refund amount, balances once per user and
+    # all transactions in a single insert
+    bets_by_refund = defaultdict(list)
     for bet in bets:
-        user_id = bet['user_id']
-        bet_id = bet['id']
         stake = bet['stake']
         refund_amount = stake if refund_type == 'full_refund' else int(stake * 0.5)
+        bets_by_refund[refund_amount].append(bet)
+    
+    try:
+        user_ids = list(unique_users)
+        balance_response = supabase.table('coin_accounts')\
+            .select('user_id, balance, total_wagered')\
+            .in_('user_id', user_ids)\
+            .execute()
+        balances_by_user = {row['user_id']: row for row in balance_response.data or []}
+    except Exception as e:
+        print(f"❌ Error loading user balances: {str(e)}")
+        return
+    
+    # Update bet statuses
+    refunded_bets = defaultdict(list)
+    for refund_amount, refund_bets in bets_by_refund.items():
+        bet_ids = [bet['id'] for bet in refund_bets
+                   if bet['user_id'] in balances_by_user]
+        for bet in refund_bets:
+            if bet['user_id'] not in balances_by_user:
+                print(f"❌ User account not found: {bet['user_id']}")
+        if not bet_ids:
+            continue
         
         try:
-            # Get current user balance
-            balance_response = supabase.table('coin_accounts')\
-                .select('balance, total_wagered')\
-                .eq('user_id', user_id)\
-                .execute()
-            
-            if not balance_response.data:
-                print(f"❌ User account not found: {user_id}")
-                continue
-            
-            current_balance = balance_response.data[0]['balance']
-            current_total_wagered = balance_response.data[0]['total_wagered'] or 0
-            
-            new_balance = current_balance + refund_amount
-            new_total_wagered = max(0, current_total_wagered - stake)
-            
-            # Update bet status
-            current_timestamp = datetime.now().isoformat()
             bet_update_response = supabase.table('bets')\
                 .update({
                     'status': 'refunded',
                     'payout': refund_amount,
                     'settled_at': current_timestamp,
-                    'refund_reason': f'MANUAL REFUND: {reason}'
+                    'refund_reason': refund_reason
                 })\
-                .eq('id', bet_id)\
+                .in_('id', bet_ids)\
                 .execute()
+        except Exception as e:
+            print(f"❌ Error updating bets {bet_ids}: {str(e)}")
+            continue
+        
+        if not bet_update_response.data:
+            print(f"❌ Failed to update bets {bet_ids}")
+            continue
+        
+        updated_ids = {row['id'] for row in bet_update_response.data}
+        for bet in refund_bets:
+            if bet['id'] in updated_ids:
+                refunded_bets[bet['user_id']].append((bet, refund_amount))
+    
+    # Update user balances
+    transaction_rows = []
+    for user_id, user_refunds in refunded_bets.items():
+        account = balances_by_user[user_id]
+        new_balance = account['balance']
+        new_total_wagered = account['total_wagered'] or 0
+        user_transactions = []
+        
+        for bet, refund_amount in user_refunds:
+            balance_before = new_balance
+            new_balance += refund_amount
+            new_total_wagered = max(0, new_total_wagered - bet['stake'])
             
-            if not bet_update_response.data:
-                print(f"❌ Failed to update bet {bet_id}")
-                continue
-            
-            # Update user balance
+            user_transactions.append({
+                'user_id': user_id,
+                'amount': refund_amount,
+                'type': 'bet_refunded',
+                'reason': f'{refund_reason} - {bet["fighter_name"]}',
+                'ref_table': 'bets',
+                'ref_id': bet['id'],
+                'balance_before': balance_before,
+                'balance_after': new_balance
+            })
+        
+        try:
             balance_update_response = supabase.table('coin_accounts')\
                 .update({
                     'balance': new_balance,
@@ -202,35 +240,31 @@ def process_emergency_refund(fight_id, reason, refund_type='full_refund', dry_ru
                 })\
                 .eq('user_id', user_id)\
                 .execute()
-            
-            if not balance_update_response.data:
-                print(f"❌ Failed to update balance for user {user_id}")
-                continue
-            
-            # Create transaction record
-            transaction_data = {
-                'user_id': user_id,
-                'amount': refund_amount,
-                'type': 'bet_refunded',
-                'reason': f'MANUAL REFUND: {reason} - {bet["fighter_name"]}',
-                'ref_table': 'bets',
-                'ref_id': bet_id,
-                'balance_before': current_balance,
-                'balance_after': new_balance
-            }
-            
+        except Exception as e:
+            print(f"❌ Error updating balance for user {user_id}: {str(e)}")
+            continue
+        
+        if not balance_update_response.data:
+            print(f"❌ Failed to update balance for user {user_id}")
+            continue
+        
+        transaction_rows.extend(user_transactions)
+    
+    # Create transaction records
+    if transaction_rows:
+        try:
             transaction_response = supabase.table('coin_transactions')\
-                .insert(transaction_data)\
+                .insert(transaction_rows)\
                 .execute()
             
             if transaction_response.data:
-                print(f"✅ Refunded {refund_amount} coins to user {user_id}")
-                successful_refunds += 1
+                for row in transaction_response.data:
+                    print(f"✅ Refunded {row['amount']} coins to user {row['user_id']}")
+                successful_refunds = len(transaction_response.data)
             else:
-                print(f"❌ Failed to create transaction record for bet {bet_id}")
-                
+                print(f"❌ Failed to create {len(transaction_rows)} transaction records")
         except Exception as e:
-            print(f"❌ Error processing refund for bet {bet_id}: {str(e)}")
+            print(f"❌ Error creating transaction records: {str(e)}")
     
     print(f"\n🎉 REFUND COMPLETE!")
     print(f"✅ Successfully processed: {successful_refunds}/{len(bets)} refunds")
@@ -242,7 +276,9 @@ def generate_refund_report(event_id=None):
     print("\n📊 REFUND REPORT")
     print("=" * 50)
     
-    query = supabase.table('bets').select('*').eq('status', 'refunded')
+    query = supabase.table('bets')\
+        .select('user_id, stake, payout, refund_reason')\
+        .eq('status', 'refunded')
     
     if event_id:
         query = query.eq('event_id', event_id)
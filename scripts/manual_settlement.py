@@ -5,7 +5,8 @@ Manual settlement script to force settlement of pending bets
 
 import sys
 import os
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timezone
 
 # Add project root to path
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
@@ -18,6 +19,143 @@ except Exception as e:
     print(f"❌ Failed to connect to Supabase: {e}")
     exit(1)
 
+def settle_bets_rpc(event_id):
+    """Settle an event with the settle_event_bets database function (see ZOCRATIC_ODDS_SYSTEM.md).
+    
+    Returns False when the function is unavailable so the caller can fall back to
+    settling bet by bet from here.
+    """
+    print(f"🔧 Settling event {event_id} with settle_event_bets...")
+    try:
+        response = supabase.rpc('settle_event_bets', {'p_event_id': event_id}).execute()
+    except Exception as e:
+        print(f"⚠️ settle_event_bets unavailable ({e}), settling from the script instead")
+        return False
+    
+    result = response.data[0] if response.data else {}
+    print(f"\n🎉 Settlement complete!")
+    print(f"📊 Settled {result.get('settled_count', 0)} bets "
+          f"({result.get('won_count', 0)} won, {result.get('lost_count', 0)} lost)")
+    print(f"💰 Paid out ${result.get('total_paid', 0)}")
+    return True
+
+EVENT_FIGHT_COLUMNS = 'fight_id, status, winner_name, fighter1_name, fighter1_id, fighter2_name, fighter2_id'
+
+def load_event_fights(event_id):
+    """Flat per-fight rows for an event, read from the v_event_fights view (see ZOCRATIC_ODDS_SYSTEM.md).
+    
+    Falls back to flattening the event's fights JSON when the view is unavailable.
+    Returns None if the event doesn't exist.
+    """
+    try:
+        response = supabase.table('v_event_fights')\
+            .select(EVENT_FIGHT_COLUMNS)\
+            .eq('event_id', event_id)\
+            .execute()
+        return response.data or None
+    except Exception as e:
+        print(f"⚠️ v_event_fights unavailable ({e}), reading the event's fights JSON")
+    
+    event_response = supabase.table('upcoming_events')\
+        .select('fights')\
+        .eq('id', event_id)\
+        .execute()
+    
+    if not event_response.data:
+        return None
+    
+    return [
+        {
+            'fight_id': f.get('fight_id'),
+            'status': f.get('status'),
+            'winner_name': (f.get('result') or {}).get('winner_name'),
+            'fighter1_name': f.get('fighter1_name'),
+            'fighter1_id': f.get('fighter1_id'),
+            'fighter2_name': f.get('fighter2_name'),
+            'fighter2_id': f.get('fighter2_id')
+        }
+        for f in event_response.data[0].get('fights') or []
+    ]
+
+def normalize_name(name):
+    """Lowercase a fighter name and collapse its whitespace for exact comparison"""
+    return ' '.join(name.lower().split())
+
+def resolve_fight_outcome(fight):
+    """Normalize a completed fight's names once and work out the winning fighter ID"""
+    winner_name = normalize_name(fight['winner_name'])
+    fighter1_name = normalize_name(fight.get('fighter1_name') or '')
+    fighter2_name = normalize_name(fight.get('fighter2_name') or '')
+    fighter1_id = fight.get('fighter1_id')
+    fighter2_id = fight.get('fighter2_id')
+    
+    # Determine winner by exact name first
+    name_to_id = {}
+    if fighter2_name:
+        name_to_id[fighter2_name] = fighter2_id
+    if fighter1_name:
+        name_to_id[fighter1_name] = fighter1_id  # fighter 1 wins a tie, as with the partial match
+    winner_fighter_id = name_to_id.get(winner_name)
+    
+    # Partial matches ("jon jones" vs "jonathan jones") are ambiguous, so only use them as a fallback
+    if winner_fighter_id is None and winner_name:
+        if fighter1_name and (winner_name in fighter1_name or fighter1_name in winner_name):
+            winner_fighter_id = fighter1_id
+        elif fighter2_name and (winner_name in fighter2_name or fighter2_name in winner_name):
+            winner_fighter_id = fighter2_id
+        
+        if winner_fighter_id:
+            print(f"   ⚠️ Winner '{winner_name}' matched by partial name for fight {fight.get('fight_id')}")
+    
+    return winner_name, fighter1_name, fighter1_id, fighter2_name, fighter2_id, winner_fighter_id
+
+def evaluate_bet(bet, fights_by_id, fight_outcomes, report):
+    """Decide whether a pending bet won, appending its report lines to `report`.
+    
+    Returns True/False for a settled fight, or None if the bet can't be settled yet.
+    """
+    report.append(f"\n🎯 Processing bet {bet['id']}")
+    report.append(f"   Fight: {bet['fight_id']}")
+    report.append(f"   Fighter: {bet['fighter_name']} (ID: {bet['fighter_id']})")
+    report.append(f"   Stake: ${bet['stake']}")
+    report.append(f"   Potential Payout: ${bet['potential_payout']}")
+    
+    # Find the fight
+    fight = fights_by_id.get(bet['fight_id'])
+    
+    if not fight:
+        report.append(f"   ❌ Fight {bet['fight_id']} not found")
+        return None
+    
+    report.append(f"   Fight Status: {fight.get('status')}")
+    
+    # Check if fight has result
+    if not fight.get('winner_name'):
+        report.append(f"   ⏳ Fight not completed yet")
+        return None
+    
+    outcome = fight_outcomes.get(bet['fight_id'])
+    if outcome is None:
+        outcome = fight_outcomes[bet['fight_id']] = resolve_fight_outcome(fight)
+    winner_name, fighter1_name, fighter1_id, fighter2_name, fighter2_id, winner_fighter_id = outcome
+    
+    report.append(f"   🏆 Winner: {winner_name}")
+    report.append(f"   Fighter 1: {fighter1_name} (ID: {fighter1_id})")
+    report.append(f"   Fighter 2: {fighter2_name} (ID: {fighter2_id})")
+    
+    if not winner_fighter_id:
+        report.append(f"   ❌ Could not determine winner: '{winner_name}' vs '{fighter1_name}' / '{fighter2_name}'")
+        return None
+    
+    report.append(f"   🎯 Winner Fighter ID: {winner_fighter_id}")
+    report.append(f"   🎲 Bet Fighter ID: {bet['fighter_id']}")
+    
+    # Check if bet won
+    won = (winner_fighter_id == bet['fighter_id'])
+    report.append(f"   {'✅ BET WON!' if won else '❌ BET LOST'}")
+    report.append(f"   💰 Payout: ${bet['potential_payout'] if won else 0}")
+    return won
+
 def manual_settle_bets():
     """Manually settle all pending bets for event 5"""
     print("🔧 Starting manual bet settlement...")
@@ -25,7 +163,7 @@ def manual_settle_bets():
     # Get all pending bets for event 5
     print("📋 Fetching pending bets...")
     bets_response = supabase.table('bets')\
-        .select('*')\
+        .select('id, user_id, fight_id, fighter_id, fighter_name, stake, potential_payout')\
         .eq('event_id', 5)\
         .eq('status', 'pending')\
         .execute()
@@ -39,19 +177,18 @@ def manual_settle_bets():
     
     # Get event data
     print("📋 Fetching event data...")
-    event_response = supabase.table('upcoming_events')\
-        .select('*')\
-        .eq('id', 5)\
-        .execute()
+    fights = load_event_fights(5)
     
-    if not event_response.data:
+    if not fights:
         print("❌ Event 5 not found")
         return False
     
-    event_data = event_response.data[0]
-    fights = event_data.get('fights', [])
     print(f"📊 Event has {len(fights)} fights")
     
+    # Index fights once; each fight's outcome is resolved the first time a bet needs it
+    fights_by_id = {f.get('fight_id'): f for f in fights}
+    fight_outcomes = {}
+    
     # Check fight statuses
     completed_fights = [f for f in fights if f.get('status') == 'completed']
     print(f"📊 {len(completed_fights)} fights are completed")
@@ -64,141 +201,125 @@ def manual_settle_bets():
         print(f"   Fighter 1: {sample_fight.get('fighter1_name')} (ID: {sample_fight.get('fighter1_id')})")
         print(f"   Fighter 2: {sample_fight.get('fighter2_name')} (ID: {sample_fight.get('fighter2_id')})")
         print(f"   Status: {sample_fight.get('status')}")
-        print(f"   Result: {sample_fight.get('result')}")
+        print(f"   Winner: {sample_fight.get('winner_name')}")
+    
+    # Pre-fetch balances for every bettor in one round-trip
+    user_ids = list({bet['user_id'] for bet in pending_bets})
+    balances_response = supabase.table('coin_accounts')\
+        .select('user_id, balance, total_won')\
+        .in_('user_id', user_ids)\
+        .execute()
+    balances_by_user = {row['user_id']: row for row in balances_response.data or []}
+    print(f"📊 Loaded {len(balances_by_user)} coin accounts")
     
-    settled_count = 0
+    # Bets are written grouped by identical (status, payout) once the loop is done
+    bet_groups = defaultdict(list)
+    winning_bets = []
+    current_timestamp = datetime.now(timezone.utc).isoformat()
     
-    # Process each bet
+    # Process each bet; each bet's report is written in one go rather than a print per line
     for bet in pending_bets:
-        print(f"\n🎯 Processing bet {bet['id']}")
-        print(f"   Fight: {bet['fight_id']}")
-        print(f"   Fighter: {bet['fighter_name']} (ID: {bet['fighter_id']})")
-        print(f"   Stake: ${bet['stake']}")
-        print(f"   Potential Payout: ${bet['potential_payout']}")
-        
-        # Find the fight
-        fight = None
-        for f in fights:
-            if f.get('fight_id') == bet['fight_id']:
-                fight = f
-                break
-        
-        if not fight:
-            print(f"   ❌ Fight {bet['fight_id']} not found")
-            continue
-        
-        print(f"   Fight Status: {fight.get('status')}")
+        report = []
+        won = evaluate_bet(bet, fights_by_id, fight_outcomes, report)
+        print('\n'.join(report))
         
-        # Check if fight has result
-        fight_result = fight.get('result')
-        if not fight_result or not fight_result.get('winner_name'):
-            print(f"   ⏳ Fight not completed yet")
+        if won is None:
             continue
         
-        winner_name = fight_result.get('winner_name', '').lower().strip()
-        print(f"   🏆 Winner: {winner_name}")
-        
-        # Get fighter names for comparison
-        fighter1_name = fight.get('fighter1_name', '').lower().strip()
-        fighter2_name = fight.get('fighter2_name', '').lower().strip()
-        fighter1_id = fight.get('fighter1_id')
-        fighter2_id = fight.get('fighter2_id')
-        
-        print(f"   Fighter 1: {fighter1_name} (ID: {fighter1_id})")
-        print(f"   Fighter 2: {fighter2_name} (ID: {fighter2_id})")
-        
-        # Determine winner
-        winner_fighter_id = None
-        if winner_name and fighter1_name and (winner_name in fighter1_name or fighter1_name in winner_name):
-            winner_fighter_id = fighter1_id
-        elif winner_name and fighter2_name and (winner_name in fighter2_name or fighter2_name in winner_name):
-            winner_fighter_id = fighter2_id
-        
-        if not winner_fighter_id:
-            print(f"   ❌ Could not determine winner: '{winner_name}' vs '{fighter1_name}' / '{fighter2_name}'")
-            continue
-        
-        print(f"   🎯 Winner Fighter ID: {winner_fighter_id}")
-        print(f"   🎲 Bet Fighter ID: {bet['fighter_id']}")
-        
-        # Check if bet won
-        won = (winner_fighter_id == bet['fighter_id'])
-        print(f"   {'✅ BET WON!' if won else '❌ BET LOST'}")
-        
         # Calculate payout
         payout_amount = bet['potential_payout'] if won else 0
         new_status = 'won' if won else 'lost'
-        current_timestamp = datetime.now().isoformat()
-        
-        print(f"   💰 Payout: ${payout_amount}")
         
-        # Update bet
+        bet_groups[(new_status, payout_amount)].append(bet['id'])
+        if won and payout_amount > 0:
+            winning_bets.append(bet)
+    
+    # Update bets, one request per (status, payout) group
+    print(f"\n📝 Writing {sum(len(ids) for ids in bet_groups.values())} bet results...")
+    settled_ids = set()
+    for (new_status, payout_amount), bet_ids in bet_groups.items():
         bet_update_response = supabase.table('bets')\
             .update({
                 'status': new_status,
                 'payout': payout_amount,
                 'settled_at': current_timestamp
             })\
-            .eq('id', bet['id'])\
+            .in_('id', bet_ids)\
             .execute()
         
         if not bet_update_response.data:
-            print(f"   ❌ Failed to update bet")
+            print(f"   ❌ Failed to update {len(bet_ids)} bets to {new_status} (payout ${payout_amount})")
             continue
         
-        print(f"   ✅ Updated bet status to: {new_status}")
+        settled_ids.update(row['id'] for row in bet_update_response.data)
+        print(f"   ✅ Updated {len(bet_update_response.data)} bets to {new_status} (payout ${payout_amount})")
+    
+    settled_count = len(settled_ids)
+    
+    # Credit winners: one balance update per user, one insert for all transactions
+    winnings_by_user = defaultdict(list)
+    for bet in winning_bets:
+        if bet['id'] in settled_ids:
+            winnings_by_user[bet['user_id']].append(bet)
+    
+    transaction_rows = []
+    for user_id, user_bets in winnings_by_user.items():
+        print(f"\n💳 Updating balance for user {user_id}...")
         
-        # Update user balance if they won
-        if won and payout_amount > 0:
-            print(f"   💳 Updating user balance...")
-            
-            # Get current balance
-            balance_response = supabase.table('coin_accounts')\
-                .select('balance, total_won')\
-                .eq('user_id', bet['user_id'])\
-                .execute()
+        account = balances_by_user.get(user_id)
+        if not account:
+            print(f"   ❌ Coin account not found")
+            continue
+        
+        current_balance = account['balance']
+        new_balance = current_balance
+        new_total_won = account['total_won'] or 0
+        user_transactions = []
+        
+        for bet in user_bets:
+            payout_amount = bet['potential_payout']
+            balance_before = new_balance
+            new_balance += payout_amount
+            new_total_won += payout_amount
             
-            if balance_response.data:
-                current_balance = balance_response.data[0]['balance']
-                current_total_won = balance_response.data[0]['total_won'] or 0
-                
-                new_balance = current_balance + payout_amount
-                new_total_won = current_total_won + payout_amount
-                
-                print(f"      Old balance: ${current_balance}")
-                print(f"      New balance: ${new_balance}")
-                
-                balance_update_response = supabase.table('coin_accounts')\
-                    .update({
-                        'balance': new_balance,
-                        'total_won': new_total_won
-                    })\
-                    .eq('user_id', bet['user_id'])\
-                    .execute()
-                
-                if balance_update_response.data:
-                    # Create transaction record
-                    transaction_data = {
-                        'user_id': bet['user_id'],
-                        'amount': payout_amount,
-                        'type': 'bet_won',
-                        'reason': f'Won bet on {bet["fighter_name"]} vs Fight {bet["fight_id"]}',
-                        'ref_table': 'bets',
-                        'ref_id': bet['id'],
-                        'balance_before': current_balance,
-                        'balance_after': new_balance
-                    }
-                    
-                    supabase.table('coin_transactions').insert(transaction_data).execute()
-                    print(f"   ✅ Balance updated and transaction recorded")
-                else:
-                    print(f"   ❌ Failed to update balance")
+            user_transactions.append({
+                'user_id': user_id,
+                'amount': payout_amount,
+                'type': 'bet_won',
+                'reason': f'Won bet on {bet["fighter_name"]} vs Fight {bet["fight_id"]}',
+                'ref_table': 'bets',
+                'ref_id': bet['id'],
+                'balance_before': balance_before,
+                'balance_after': new_balance
+            })
         
-        settled_count += 1
+        print(f"   Old balance: ${current_balance}")
+        print(f"   New balance: ${new_balance}")
+        
+        balance_update_response = supabase.table('coin_accounts')\
+            .update({
+                'balance': new_balance,
+                'total_won': new_total_won
+            })\
+            .eq('user_id', user_id)\
+            .execute()
+        
+        if balance_update_response.data:
+            account['balance'] = new_balance
+            account['total_won'] = new_total_won
+            transaction_rows.extend(user_transactions)
+            print(f"   ✅ Balance updated")
+        else:
+            print(f"   ❌ Failed to update balance")
+    
+    if transaction_rows:
+        supabase.table('coin_transactions').insert(transaction_rows).execute()
+        print(f"✅ Recorded {len(transaction_rows)} transactions")
     
     print(f"\n🎉 Settlement complete!")
     print(f"📊 Settled {settled_count} bets")
     return True
 
 if __name__ == "__main__":
-    manual_settle_bets() 
\ No newline at end of file
+    if not settle_bets_rpc(5):
+        manual_settle_bets() 
\ No newline at end of file
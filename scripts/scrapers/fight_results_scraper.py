@@ -1,5 +1,9 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+from bs4 import BeautifulSoup, SoupStrainer
+import gzip
 import json
 import time
 import random
@@ -8,9 +12,11 @@ import sys
 import logging
 from dotenv import load_dotenv
 import argparse
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import pandas as pd
 import re
+import io
+from collections import defaultdict
 
 # Add project root to path
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
@@ -22,17 +28,64 @@ load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '../../.env'))
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Parse with lxml's C parser when it is installed; html.parser is the pure-Python fallback
+try:
+    from lxml import etree
+    lxml_available = True
+    HTML_PARSER = "lxml"
+    
+    # True for a result row inside a table whose W/L cell's first b-flag__text marker reads
+    # "win"; evaluated by libxml2 on each streamed <tr> instead of walking cells from Python
+    IS_WIN_ROW_XPATH = etree.XPath(
+        'boolean(ancestor::table) and count(.//td) >= 8 and translate(normalize-space('
+        '(.//td[1]//i[contains(concat(" ", normalize-space(@class), " "), " b-flag__text ")])[1]'
+        '), "win", "WIN") = "WIN"'
+    )
+except ImportError:
+    lxml_available = False
+    HTML_PARSER = "html.parser"
+
+try:
+    import orjson
+    orjson_available = True
+except ImportError:
+    orjson_available = False
+
+# The BeautifulSoup fallback only builds <table> subtrees; results never live outside them
+TABLE_STRAINER = SoupStrainer("table")
+
 # Use a persistent session for faster HTTP requests
 HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
         "AppleWebKit/537.36 (KHTML, like Gecko) "
         "Chrome/91.0.4472.124 Safari/537.36"
-    )
+    ),
+    # requests decompresses these transparently; br is left out since brotli is optional
+    "Accept-Encoding": "gzip, deflate",
 }
 session = requests.Session()
 session.headers.update(HEADERS)
 
+# Keep connections alive across polls and let urllib3 retry idempotent GETs with backoff.
+# 429 responses are retried too; urllib3 honours their Retry-After header before backing off.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+retry = Retry(total=3, backoff_factor=1, status_forcelist=RETRY_STATUSES, allowed_methods=("GET",))
+adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=retry)
+session.mount("http://", adapter)
+session.mount("https://", adapter)
+
+# The adapter's Retry only covers connecting and the response status. A connection that drops or
+# stalls while the streamed body is being parsed surfaces as one of these, so the page fetch is
+# repeated once for them (raw urllib3 errors from the lxml path, requests' wrappers from .content)
+BODY_READ_ERRORS = (
+    ProtocolError,
+    ReadTimeoutError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ConnectionError,
+)
+BODY_READ_ATTEMPTS = 2
+
 # Import Supabase client
 try:
     from backend.api.database import get_supabase_client
@@ -64,7 +117,6 @@ def should_monitor_event(event_data):
         if event_start_str.endswith('Z'):
             event_start_str = event_start_str.replace('Z', '+00:00')
         
-        from datetime import timezone
         event_start = datetime.fromisoformat(event_start_str)
         if event_start.tzinfo is None:
             event_start = event_start.replace(tzinfo=timezone.utc)
@@ -96,6 +148,14 @@ def should_monitor_event(event_data):
         logger.error(f"Error checking event timing: {str(e)}")
         return True  # Default to monitoring if we can't determine timing
 
+# PostgREST keeps ids for in_() filters in the URL; bulk writes are chunked to stay under its limits
+IN_FILTER_BATCH_SIZE = 200
+INSERT_BATCH_SIZE = 1000
+
+def chunked(items, size):
+    """Split a list into consecutive slices of at most size items"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
 def settle_event_predictions(event_id):
     """Settle predictions for completed fights in an event"""
     if not db_available or not supabase:
@@ -103,42 +163,43 @@ def settle_event_predictions(event_id):
         return False
     
     try:
-        # Get all pending bets for this event that haven't been settled yet
-        bets_response = supabase.table('bets')\
-            .select('*')\
-            .eq('event_id', event_id)\
-            .eq('status', 'pending')\
-            .is_('settled_at', 'null')\
+        # Get the event's fight results together with its pending, unsettled bets in one request.
+        # Embedding bets under the event (rather than the event under each bet) sends the
+        # fights JSON once instead of once per bet.
+        event_response = supabase.table('upcoming_events')\
+            .select('id, fights, bets(*)')\
+            .eq('id', event_id)\
+            .eq('bets.status', 'pending')\
+            .is_('bets.settled_at', 'null')\
             .execute()
         
-        if not bets_response.data:
+        event_data = event_response.data[0] if event_response.data else {}
+        pending_bets = event_data.get('bets') or []
+        
+        if not pending_bets:
             logger.info(f"No pending bets to settle for event {event_id}")
             return True
             
-        pending_bets = bets_response.data
         logger.info(f"Found {len(pending_bets)} pending bets to settle")
         
-        # Get event data with fight results
-        event_response = supabase.table('upcoming_events')\
-            .select('*')\
-            .eq('id', event_id)\
-            .execute()
-            
-        if not event_response.data:
-            logger.error(f"Event {event_id} not found")
-            return False
-            
-        event_data = event_response.data[0]
         fights = event_data.get('fights', [])
         
-        settled_count = 0
+        # Index fights once instead of scanning the card for every bet; the first fight wins on
+        # a duplicated fight_id, as the linear scan did
+        fights_by_id = {}
+        for f in fights:
+            fights_by_id.setdefault(f.get('fight_id'), f)
+        
+        # Bets are written grouped by identical (status, payout) once the loop is done
+        bet_groups = defaultdict(list)
+        winning_bets = []
+        current_timestamp = datetime.now(timezone.utc).isoformat()
         
         for bet in pending_bets:
             fight_id = bet['fight_id']
             fighter_id = bet['fighter_id']
             stake = bet['stake']
             potential_payout = bet['potential_payout']
-            user_id = bet['user_id']
             bet_id = bet['id']
             
             # Extra safety check - skip if bet already has a payout or is settled
@@ -147,11 +208,7 @@ def settle_event_predictions(event_id):
                 continue
             
             # Find the corresponding fight
-            fight = None
-            for f in fights:
-                if f.get('fight_id') == fight_id:
-                    fight = f
-                    break
+            fight = fights_by_id.get(fight_id)
                     
             if not fight:
                 logger.warning(f"Fight {fight_id} not found in event data")
@@ -191,73 +248,96 @@ def settle_event_predictions(event_id):
             won = (winner_fighter_id == fighter_id)
                 
             # Calculate payout
-            if won:
-                payout_amount = potential_payout
-                new_status = 'won'
-            else:
-                payout_amount = 0
-                new_status = 'lost'
+            payout_amount = potential_payout if won else 0
+            new_status = 'won' if won else 'lost'
+            
+            bet_groups[(new_status, payout_amount)].append(bet_id)
+            if won and payout_amount > 0:
+                winning_bets.append(bet)
+        
+        # Update bets, one request per (status, payout) group and id chunk
+        settled_ids = set()
+        for (new_status, payout_amount), bet_ids in bet_groups.items():
+            for id_chunk in chunked(bet_ids, IN_FILTER_BATCH_SIZE):
+                bet_update_response = supabase.table('bets')\
+                    .update({
+                        'status': new_status,
+                        'payout': payout_amount,
+                        'settled_at': current_timestamp
+                    })\
+                    .in_('id', id_chunk)\
+                    .execute()
                 
-            # Update bet status and payout with timestamp
-            current_timestamp = datetime.now().isoformat()
-            bet_update_response = supabase.table('bets')\
-                .update({
-                    'status': new_status,
-                    'payout': payout_amount,
-                    'settled_at': current_timestamp
-                })\
-                .eq('id', bet_id)\
-                .execute()
+                if not bet_update_response.data:
+                    logger.error(f"Failed to update {len(id_chunk)} bets to {new_status}")
+                    continue
                 
-            if not bet_update_response.data:
-                logger.error(f"Failed to update bet {bet_id}")
+                settled_ids.update(row['id'] for row in bet_update_response.data)
+                if not (new_status == 'won' and payout_amount > 0):
+                    for row in bet_update_response.data:
+                        logger.info(f"❌ Settled losing bet: {row['fighter_name']} - Settled at: {current_timestamp}")
+        
+        settled_count = len(settled_ids)
+        
+        # Credit winners: balances fetched in one query, one update per user, transactions bulk-inserted
+        winnings_by_user = defaultdict(list)
+        for bet in winning_bets:
+            if bet['id'] in settled_ids:
+                winnings_by_user[bet['user_id']].append(bet)
+        
+        balances_by_user = {}
+        for user_chunk in chunked(list(winnings_by_user), IN_FILTER_BATCH_SIZE):
+            balance_response = supabase.table('coin_accounts')\
+                .select('user_id, balance, total_won')\
+                .in_('user_id', user_chunk)\
+                .execute()
+            balances_by_user.update({row['user_id']: row for row in balance_response.data or []})
+        
+        transaction_rows = []
+        for user_id, user_bets in winnings_by_user.items():
+            account = balances_by_user.get(user_id)
+            if not account:
+                logger.error(f"Failed to update balance for user {user_id}")
                 continue
+            
+            new_balance = account['balance']
+            new_total_won = account['total_won'] or 0
+            user_transactions = []
+            
+            for bet in user_bets:
+                payout_amount = bet['potential_payout']
+                balance_before = new_balance
+                new_balance += payout_amount
+                new_total_won += payout_amount
                 
-            # Update user balance if they won
-            if won and payout_amount > 0:
-                # Get current balance
-                balance_response = supabase.table('coin_accounts')\
-                    .select('balance, total_won')\
-                    .eq('user_id', user_id)\
-                    .execute()
-                    
-                if balance_response.data:
-                    current_balance = balance_response.data[0]['balance']
-                    current_total_won = balance_response.data[0]['total_won'] or 0
-                    
-                    new_balance = current_balance + payout_amount
-                    new_total_won = current_total_won + payout_amount
-                    
-                    balance_update_response = supabase.table('coin_accounts')\
-                        .update({
-                            'balance': new_balance,
-                            'total_won': new_total_won
-                        })\
-                        .eq('user_id', user_id)\
-                        .execute()
-                        
-                    if balance_update_response.data:
-                        # Create transaction record
-                        transaction_data = {
-                            'user_id': user_id,
-                            'amount': payout_amount,
-                            'type': 'bet_won',
-                            'reason': f'Won bet on {bet["fighter_name"]} vs Fight {fight_id}',
-                            'ref_table': 'bets',
-                            'ref_id': bet_id,
-                            'balance_before': current_balance,
-                            'balance_after': new_balance
-                        }
-                        
-                        supabase.table('coin_transactions').insert(transaction_data).execute()
-                        
-                        logger.info(f"✅ Settled winning bet: {bet['fighter_name']} - Payout: {payout_amount} - Settled at: {current_timestamp}")
-                    else:
-                        logger.error(f"Failed to update balance for user {user_id}")
+                user_transactions.append({
+                    'user_id': user_id,
+                    'amount': payout_amount,
+                    'type': 'bet_won',
+                    'reason': f'Won bet on {bet["fighter_name"]} vs Fight {bet["fight_id"]}',
+                    'ref_table': 'bets',
+                    'ref_id': bet['id'],
+                    'balance_before': balance_before,
+                    'balance_after': new_balance
+                })
+            
+            balance_update_response = supabase.table('coin_accounts')\
+                .update({
+                    'balance': new_balance,
+                    'total_won': new_total_won
+                })\
+                .eq('user_id', user_id)\
+                .execute()
+            
+            if balance_update_response.data:
+                transaction_rows.extend(user_transactions)
+                for bet in user_bets:
+                    logger.info(f"✅ Settled winning bet: {bet['fighter_name']} - Payout: {bet['potential_payout']} - Settled at: {current_timestamp}")
             else:
-                logger.info(f"❌ Settled losing bet: {bet['fighter_name']} - Settled at: {current_timestamp}")
-                
-            settled_count += 1
+                logger.error(f"Failed to update balance for user {user_id}")
+        
+        for row_chunk in chunked(transaction_rows, INSERT_BATCH_SIZE):
+            supabase.table('coin_transactions').insert(row_chunk).execute()
             
         logger.info(f"✅ Settled {settled_count} predictions for event {event_id}")
         return True
@@ -281,109 +361,133 @@ def get_active_event():
         logger.error(f"Error getting active event: {str(e)}")
         return None
 
-def extract_fight_results(event_url, max_retries=3):
+def extract_fight_results(event_url):
     """Extract fight results from a completed/ongoing UFC event page"""
     logger.info(f"Extracting results from event: {event_url}")
     
-    for attempt in range(1, max_retries + 1):
-        try:
+    try:
+        for attempt in range(1, BODY_READ_ATTEMPTS + 1):
             time.sleep(random.uniform(1.0, 2.0))
-            resp = session.get(event_url, timeout=(5, 30))
-            resp.raise_for_status()
-            
-            soup = BeautifulSoup(resp.text, "html.parser")
-            results = []
-            
-            # Find all fight result tables
-            fight_tables = soup.find_all("table")
-            
-            if not fight_tables:
-                logger.warning("Could not find any tables")
-                return []
-            
-            # Process all table rows looking for WIN indicators
-            for table in fight_tables:
-                rows = table.find_all("tr")
+            # Timeouts, dropped connections and transient 4xx/5xx statuses are retried by the session's adapter
+            with session.get(event_url, timeout=(5, 30), stream=True) as resp:
+                resp.raise_for_status()
                 
-                for row in rows:
-                    cells = row.find_all("td")
-                    if not cells or len(cells) < 8:
-                        continue
-                        
-                    # Check if this row has a WIN indicator - look for the specific flag structure
-                    wl_cell = cells[0]
-                    win_flag = wl_cell.find("i", class_="b-flag__text")
-                    
-                    if win_flag and win_flag.get_text(strip=True).upper() == "WIN":
-                        # Extract result data from this row
-                        result_data = extract_result_from_row(row)
-                        if result_data:
-                            results.append({
-                                "winner_name": result_data["winner_name"],
-                                "method": result_data["method"], 
-                                "round": result_data["round"],
-                                "time": result_data["time"]
-                            })
+                try:
+                    if lxml_available:
+                        # Feed libxml2 straight from the (decompressed) socket stream so the page is never
+                        # buffered or decoded as a whole in Python
+                        resp.raw.decode_content = True
+                        # resp.encoding falls back to ISO-8859-1 for any text/* reply, so only trust it
+                        # when the Content-Type actually carries a charset
+                        content_type = resp.headers.get('Content-Type', '').lower()
+                        encoding = resp.encoding if 'charset=' in content_type else None
+                        results = extract_win_rows(resp.raw, encoding=encoding)
+                    else:
+                        results = parse_fight_results(resp.content)
+                except BODY_READ_ERRORS as e:
+                    if attempt == BODY_READ_ATTEMPTS:
+                        raise
+                    wait_time = 2 ** attempt
+                    logger.warning(f"Connection lost while reading the event page, attempt {attempt}/{BODY_READ_ATTEMPTS}: {e}")
+                    logger.info(f"Retrying in {wait_time} seconds...")
+                    time.sleep(wait_time)
+                    continue
             
             logger.info(f"Found {len(results)} fight results")
             return results
-            
-        except requests.exceptions.Timeout as e:
-            logger.warning(f"Timeout extracting results, attempt {attempt}/{max_retries}: {e}")
-            if attempt < max_retries:
-                wait_time = 2 ** attempt
-                logger.info(f"Retrying in {wait_time} seconds...")
-                time.sleep(wait_time)
-        except Exception as e:
-            logger.error(f"Failed to extract results: {e}")
-            import traceback
-            traceback.print_exc()
-            if attempt < max_retries:
-                wait_time = 2 ** attempt
-                logger.info(f"Retrying in {wait_time} seconds...")
-                time.sleep(wait_time)
-            else:
-                return []
-    
-    return []
+        
+    except Exception as e:
+        logger.exception(f"Failed to extract results: {e}")
+        return []
 
-def extract_result_from_table(table):
-    """Extract result data from a fight table"""
-    try:
-        # This is a simplified extraction - you'll need to adapt based on UFC Stats structure
+def parse_fight_results(content):
+    """Parse the WIN rows of a UFC Stats event page with BeautifulSoup (used when lxml is missing)"""
+    # Hand over the raw bytes so the parser sniffs the encoding itself
+    soup = BeautifulSoup(content, HTML_PARSER, parse_only=TABLE_STRAINER)
+    results = []
+    
+    # Find all fight result tables
+    fight_tables = soup.find_all("table")
+    
+    if not fight_tables:
+        logger.warning("Could not find any tables")
+        return []
+    
+    # Process all table rows looking for WIN indicators
+    for table in fight_tables:
         rows = table.find_all("tr")
-        if len(rows) < 2:
-            return None
-        
-        # Look for result indicators in the table
-        result_data = {
-            "winner": None,
-            "winner_name": None,
-            "method": None,
-            "round": None,
-            "time": None,
-            "details": None
-        }
         
-        # Extract fighter names and determine winner
-        fighter_links = table.find_all("a", href=lambda href: href and href.startswith("http://ufcstats.com/fighter-details/"))
-        if len(fighter_links) >= 2:
-            fighter1_name = fighter_links[0].get_text(strip=True)
-            fighter2_name = fighter_links[1].get_text(strip=True)
-            
-            # Look for win/loss indicators (this needs to be adapted to actual UFC Stats structure)
-            # You'll need to analyze the actual HTML structure to extract results properly
+        for row in rows:
+            cells = row.find_all("td")
+            if not cells or len(cells) < 8:
+                continue
+                
+            # Check if this row has a WIN indicator - look for the specific flag structure
+            wl_cell = cells[0]
+            win_flag = wl_cell.find("i", class_="b-flag__text")
             
-            return {
-                "fighter1_name": fighter1_name,
-                "fighter2_name": fighter2_name,
-                "result": result_data
-            }
+            if win_flag and win_flag.get_text(strip=True).upper() == "WIN":
+                # Extract result data from this row
+                result_data = extract_result_from_row(row)
+                if result_data:
+                    results.append({
+                        "winner_name": result_data["winner_name"],
+                        "method": result_data["method"], 
+                        "round": result_data["round"],
+                        "time": result_data["time"]
+                    })
+    
+    return results
+
+def stripped_text(element):
+    """lxml equivalent of BeautifulSoup's get_text(strip=True)"""
+    return "".join(text.strip() for text in element.itertext())
+
+def extract_win_rows(source, encoding=None):
+    """Extract results from the WIN rows of an event page, streaming one <tr> at a time
+    
+    source is the page as bytes or a binary file-like object (e.g. a response's raw stream).
+    encoding overrides libxml2's own detection (a <meta charset>, else Latin-1) and should be
+    passed whenever the HTTP headers name one.
+    Each row is discarded (along with any siblings already seen) once it has been checked,
+    so the parsed tree never holds more than the current row instead of the whole page.
+    """
+    if isinstance(source, bytes):
+        if not source.strip():
+            return []  # lxml refuses empty documents
+        source = io.BytesIO(source)
+    
+    results = []
+    rows = etree.iterparse(source, events=("end",), tag="tr", html=True, encoding=encoding)
+    
+    try:
+        for _, row in rows:
+            if IS_WIN_ROW_XPATH(row):
+                # UFC Stats structure: W/L, Fighter, KD, STR, TD, SUB, Weight Class, Method, Round, Time
+                # iter() walks descendants in document order like './/td' without evaluating XPath per row
+                cells = list(row.iter("td"))
+                
+                # Cell 1 contains both fighters concatenated; the winner is resolved later
+                fighter_cell = stripped_text(cells[1])
+                if fighter_cell:
+                    results.append({
+                        "winner_name": fighter_cell,
+                        "method": stripped_text(cells[7]),
+                        "round": stripped_text(cells[8]) if len(cells) > 8 else "",
+                        "time": stripped_text(cells[9]) if len(cells) > 9 else ""
+                    })
         
-        return None
-    except Exception as e:
-        logger.error(f"Error extracting result from table: {str(e)}")
-        return None
+            # Rows nested inside another row's cell must survive until the outer row is checked
+            if not any(ancestor.tag == "tr" for ancestor in row.iterancestors()):
+                row.clear()
+                while row.getprevious() is not None:
+                    del row.getparent()[0]
+    except etree.XMLSyntaxError:
+        # A stream can only be found empty once read; failing after the root element is real breakage
+        if rows.root is not None:
+            raise
+    
+    return results
 
 def extract_result_from_row(row):
     """Extract result data from a table row"""
@@ -417,79 +521,129 @@ def extract_result_from_row(row):
         logger.error(f"Error extracting result from row: {str(e)}")
         return None
 
-def match_fight_to_database(scraped_fight, db_fights):
-    """Match a scraped fight result to a database fight record"""
-    # Handle concatenated winner name (e.g., "Ateba GautierRobert Valentin")
-    winner_name = scraped_fight.get("winner_name", "").lower().strip()
-    
-    if not winner_name:
-        return None
+def clean_db_fight_names(db_fights):
+    """Lowercase and strip each database fight's names once, before matching any scraped rows"""
+    cleaned = []
     
     for i, db_fight in enumerate(db_fights):
         db_f1 = db_fight.get("fighter1_name", "").lower().strip()
         db_f2 = db_fight.get("fighter2_name", "").lower().strip()
         
-        # Check if both database fighter names appear in the concatenated winner string
+        # Fights missing either name can never match a concatenated winner string
         if db_f1 and db_f2:
-            # Remove spaces from all names for comparison
-            db_f1_clean = db_f1.replace(" ", "")
-            db_f2_clean = db_f2.replace(" ", "")
-            winner_clean = winner_name.replace(" ", "")
-            
-            # Check if the concatenated string contains both fighters
-            if db_f1_clean in winner_clean and db_f2_clean in winner_clean:
-                # Extract the actual winner from the concatenated string
-                # The winner appears first in the concatenation
-                actual_winner = extract_winner_from_concatenated_string(winner_name, db_f1, db_f2)
-                scraped_fight["actual_winner"] = actual_winner
-                return i
+            # Space-free variants are what the concatenated UFC Stats cell is compared against
+            cleaned.append((i, db_f1, db_f2, db_f1.replace(" ", ""), db_f2.replace(" ", "")))
+    
+    return cleaned
+
+def index_concatenated_names(db_fight_names):
+    """Map each fight's space-free "winnerloser" string, in both orders, to (index, winner)
+    
+    UFC Stats renders the fighter cell as the winner's name followed by the loser's, so the
+    cleaned cell normally equals one of these keys exactly.
+    """
+    concat_index = {}
+    
+    for i, db_f1, db_f2, db_f1_clean, db_f2_clean in db_fight_names:
+        concat_index.setdefault(db_f1_clean + db_f2_clean, (i, db_f1))
+        concat_index.setdefault(db_f2_clean + db_f1_clean, (i, db_f2))
+    
+    return concat_index
+
+def match_fight_to_database(scraped_fight, db_fight_names, concat_index=None):
+    """Match a scraped fight result to a database fight record
+    
+    db_fight_names comes from clean_db_fight_names() so the database side is normalized
+    once per event rather than once per scraped row. When concat_index (from
+    index_concatenated_names()) is given, an exact hit on it is used before falling back
+    to the substring scan.
+    """
+    # Handle concatenated winner name (e.g., "Ateba GautierRobert Valentin")
+    winner_name = scraped_fight.get("winner_name", "").lower().strip()
+    
+    if not winner_name:
+        return None
+    
+    winner_clean = winner_name.replace(" ", "")
+    
+    if concat_index:
+        hit = concat_index.get(winner_clean)
+        if hit:
+            i, actual_winner = hit
+            scraped_fight["actual_winner"] = actual_winner
+            return i
+    
+    for i, db_f1, db_f2, db_f1_clean, db_f2_clean in db_fight_names:
+        # Check if the concatenated string contains both fighters
+        if db_f1_clean in winner_clean and db_f2_clean in winner_clean:
+            # Extract the actual winner from the concatenated string
+            # The winner appears first in the concatenation
+            actual_winner = extract_winner_from_concatenated_string(
+                winner_clean, db_f1_clean, db_f2_clean, db_f1, db_f2
+            )
+            scraped_fight["actual_winner"] = actual_winner
+            return i
     
     return None
 
-def extract_winner_from_concatenated_string(concatenated_name, fighter1_name, fighter2_name):
+def extract_winner_from_concatenated_string(concat_clean, f1_clean, f2_clean, fighter1_name, fighter2_name):
     """
     Extract the actual winner from concatenated string like 'Ateba GautierRobert Valentin'
     The winner appears first in the concatenation
-    """
-    # Remove spaces for cleaner matching
-    concat_clean = concatenated_name.replace(" ", "").lower()
-    f1_clean = fighter1_name.replace(" ", "").lower()
-    f2_clean = fighter2_name.replace(" ", "").lower()
     
-    # Check which fighter name appears first in the concatenated string
+    All *_clean arguments are already lowercased with spaces removed by the caller.
+    Returns None when neither fighter appears in the string.
+    """
     f1_pos = concat_clean.find(f1_clean)
     f2_pos = concat_clean.find(f2_clean)
     
-    # The winner is the one whose name appears first (position 0 or close to 0)
-    if f1_pos == 0:
-        return fighter1_name
-    elif f2_pos == 0:
-        return fighter2_name
-    elif f1_pos >= 0 and f2_pos >= 0:
-        # If both are found but neither at position 0, winner is the one that appears first
-        if f1_pos < f2_pos:
-            return fighter1_name
-        else:
-            return fighter2_name
-    elif f1_pos >= 0:
+    if f1_pos < 0 and f2_pos < 0:
+        return None
+    
+    # Fighter 1 wins when only it is found, when it leads the string (a name that is a
+    # prefix of the other still counts), or when it appears before fighter 2
+    if f1_pos >= 0 and (f2_pos < 0 or f1_pos == 0 or f1_pos < f2_pos):
         return fighter1_name
-    elif f2_pos >= 0:
-        return fighter2_name
-    else:
-        # Fallback - return the concatenated name as is
-        return concatenated_name
+    return fighter2_name
 
 def update_event_with_results(event_data, scraped_results):
-    """Update event data with scraped results"""
+    """Update event data with scraped results
+    
+    Returns the event and the indices of the fights that received a new result.
+    """
     if not scraped_results:
         logger.warning("No results to update")
-        return event_data, 0
+        return event_data, []
 
-    updated_fights = 0
+    updated_fights = []
     fights = event_data.get("fights", [])
+    # One UTC timestamp for every fight completed in this pass and for the event itself
+    now_iso = datetime.now(timezone.utc).isoformat()
+    db_fight_names = clean_db_fight_names(fights)
+    concat_index = index_concatenated_names(db_fight_names)
+    
+    # Count completed fights and fights still waiting on a winner in one pass; the completed
+    # count is kept current below, so the event-level stats need no second walk.
+    # Once no fights are open no scraped row can change anything. Matching itself still runs
+    # against every fight so a finished fight's row can never be substring-matched onto a
+    # different, still-open one.
+    completed_fights = 0
+    open_fights = 0
+    for f in fights:
+        if f.get("status") == "completed":
+            completed_fights += 1
+            if f.get("result", {}).get("winner_name"):
+                continue
+        open_fights += 1
+    
+    if open_fights == 0:
+        logger.info("All fights already have results - skipping matching")
 
     for scraped_fight in scraped_results:
-        match_index = match_fight_to_database(scraped_fight, fights)
+        if open_fights == 0:
+            break
+        
+        match_index = match_fight_to_database(scraped_fight, db_fight_names, concat_index)
 
         if match_index is not None:
             fight = fights[match_index]
@@ -505,31 +659,32 @@ def update_event_with_results(event_data, scraped_results):
                 if result_data.get("actual_winner"):
                     processed_result["winner_name"] = result_data["actual_winner"]
                 fight["result"] = processed_result
+                if fight.get("status") != "completed":
+                    completed_fights += 1
                 fight["status"] = "completed"
-                fight["completed_at"] = datetime.now().isoformat()
+                fight["completed_at"] = now_iso
 
                 # Calculate prediction accuracy
                 prediction = fight.get("prediction")
                 predicted_winner = prediction.get("predicted_winner_name") if prediction else None
-                # Use the extracted actual winner (not the concatenated string)
-                actual_winner = result_data.get("actual_winner") or result_data.get("winner_name")
+                # Use the extracted actual winner (not the concatenated string). It is one of the
+                # names clean_db_fight_names() already lowercased and stripped, so only the raw
+                # scraped fallback still needs normalizing.
+                actual_clean = result_data.get("actual_winner") or result_data["winner_name"].lower().strip()
 
-                if predicted_winner and actual_winner:
+                if predicted_winner and actual_clean:
                     # Simple comparison of predicted vs actual winner (names only)
-                    predicted_clean = predicted_winner.lower().strip()
-                    actual_clean = actual_winner.lower().strip()
-
-                    fight["prediction_correct"] = predicted_clean == actual_clean
+                    fight["prediction_correct"] = predicted_winner.lower().strip() == actual_clean
 
-                updated_fights += 1
+                updated_fights.append(match_index)
+                open_fights -= 1
                 logger.info(f"NEW RESULT - Updated fight: {fight['fighter1_name']} vs {fight['fighter2_name']}")
     
     # Update event-level statistics
-    completed_fights = sum(1 for f in fights if f.get("status") == "completed")
     total_fights = len(fights)
     
     event_data["completed_fights"] = completed_fights
-    event_data["results_updated_at"] = datetime.now().isoformat()
+    event_data["results_updated_at"] = now_iso
     
     if completed_fights == total_fights:
         event_data["status"] = "completed"
@@ -539,12 +694,57 @@ def update_event_with_results(event_data, scraped_results):
     
     return event_data, updated_fights
 
-def save_updated_event(event_data):
-    """Save updated event data back to database"""
+# Per-fight keys written by update_event_with_results; only these travel in the RPC patches
+FIGHT_RESULT_KEYS = ("result", "status", "completed_at", "prediction_correct")
+
+def save_fight_results_rpc(event_data, updated_indices):
+    """Patch only the changed fights with the update_fight_results database function (see ZOCRATIC_ODDS_SYSTEM.md).
+    
+    Patches are keyed by fight_id, which the function resolves under the row lock, so a card
+    reordered since it was read cannot take a result in the wrong slot. Returns False when the
+    function is unavailable or refuses the patches (unknown fight_id) so the caller can fall
+    back to writing the whole fights array.
+    """
+    fights = event_data['fights']
+    updated = [fights[i] for i in updated_indices]
+    
+    if any(fight.get('fight_id') is None for fight in updated):
+        logger.warning("Updated fights without a fight_id, saving the full fights array instead")
+        return False
+    
+    patches = [
+        {'fight_id': str(fight['fight_id']), 'patch': {key: fight[key] for key in FIGHT_RESULT_KEYS if key in fight}}
+        for fight in updated
+    ]
+    
+    try:
+        response = supabase.rpc('update_fight_results', {
+            'p_event_id': event_data['id'],
+            'p_patches': patches,
+            'p_status': event_data['status'],
+            'p_completed_fights': event_data['completed_fights'],
+            'p_results_updated_at': event_data['results_updated_at']
+        }).execute()
+    except Exception as e:
+        logger.warning(f"update_fight_results failed ({e}), saving the full fights array instead")
+        return False
+    
+    logger.info(f"Patched {response.data} fights in database")
+    return True
+
+def save_updated_event(event_data, updated_indices=None):
+    """Save updated event data back to database
+    
+    When the changed fight indices are known, only those fights are sent through
+    save_fight_results_rpc(); otherwise (or if the RPC fails) the full fights array is written.
+    """
     if not db_available or not supabase:
         logger.error("Database not available")
         return False
     
+    if updated_indices and save_fight_results_rpc(event_data, updated_indices):
+        return True
+    
     try:
         response = supabase.table('upcoming_events').update({
             'fights': event_data['fights'],
@@ -561,41 +761,57 @@ def save_updated_event(event_data):
             return False
             
     except Exception as e:
-        logger.error(f"Error saving updated event: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"Error saving updated event: {str(e)}")
         return False
 
+_EVENT_ID_STRIP_RE = re.compile(r'[^a-z0-9\-]')
+_EVENT_ID_TRANS = str.maketrans({":": None, " ": "-"})
+
 def generate_event_id(event_name):
     """Generate a clean event ID from event name"""
-    # Convert to lowercase, replace spaces with hyphens, remove special chars
-    event_id = event_name.lower()
-    event_id = event_id.replace(":", "")
-    event_id = event_id.replace(" ", "-")
+    # Convert to lowercase, drop colons and turn spaces into hyphens in one translate pass
+    event_id = event_name.lower().translate(_EVENT_ID_TRANS)
     event_id = event_id.replace("--", "-")
     
-    # Remove any remaining special characters except hyphens
-    event_id = re.sub(r'[^a-z0-9\-]', '', event_id)
+    # Remove any remaining special characters except hyphens; this must stay after the
+    # "--" collapse so IDs (and bucket filenames) match the ones already exported
+    event_id = _EVENT_ID_STRIP_RE.sub('', event_id)
     
     return event_id
 
 def calculate_accuracy_stats(fights):
     """Calculate prediction accuracy statistics for the event"""
     total_fights = len(fights)
-    completed_fights = sum(1 for f in fights if f.get("status") == "completed")
-    correct_predictions = sum(1 for f in fights if f.get("prediction_correct") is True)
+    completed_fights = 0
+    correct_predictions = 0
     
-    accuracy_percentage = (correct_predictions / completed_fights * 100) if completed_fights > 0 else 0
+    # [completed, correct] per confidence level, filled in a single pass over the card
+    buckets = {"high_confidence": [0, 0], "medium_confidence": [0, 0], "low_confidence": [0, 0]}
     
-    # Calculate accuracy by confidence level
-    high_confidence = [f for f in fights if f.get("prediction") and f.get("prediction", {}).get("confidence_percent", 0) > 75]
-    medium_confidence = [f for f in fights if f.get("prediction") and 60 <= f.get("prediction", {}).get("confidence_percent", 0) <= 75]
-    low_confidence = [f for f in fights if f.get("prediction") and f.get("prediction", {}).get("confidence_percent", 0) < 60]
+    for f in fights:
+        completed = f.get("status") == "completed"
+        correct = f.get("prediction_correct") is True
+        completed_fights += completed
+        correct_predictions += correct
+        
+        prediction = f.get("prediction")
+        if not prediction or not completed:
+            continue
+        
+        confidence = prediction.get("confidence_percent", 0)
+        if confidence > 75:
+            bucket = buckets["high_confidence"]
+        elif 60 <= confidence <= 75:
+            bucket = buckets["medium_confidence"]
+        elif confidence < 60:
+            bucket = buckets["low_confidence"]
+        else:
+            continue
+        
+        bucket[0] += 1
+        bucket[1] += correct
     
-    def calc_accuracy(fight_list):
-        completed = [f for f in fight_list if f.get("status") == "completed"]
-        correct = [f for f in completed if f.get("prediction_correct") is True]
-        return (len(correct) / len(completed) * 100) if completed else 0
+    accuracy_percentage = (correct_predictions / completed_fights * 100) if completed_fights > 0 else 0
     
     stats = {
         "total_fights": total_fights,
@@ -603,18 +819,11 @@ def calculate_accuracy_stats(fights):
         "correct_predictions": correct_predictions,
         "accuracy_percentage": round(accuracy_percentage, 2),
         "by_confidence": {
-            "high_confidence": {
-                "count": len([f for f in high_confidence if f.get("status") == "completed"]),
-                "accuracy": round(calc_accuracy(high_confidence), 2)
-            },
-            "medium_confidence": {
-                "count": len([f for f in medium_confidence if f.get("status") == "completed"]),
-                "accuracy": round(calc_accuracy(medium_confidence), 2)
-            },
-            "low_confidence": {
-                "count": len([f for f in low_confidence if f.get("status") == "completed"]),
-                "accuracy": round(calc_accuracy(low_confidence), 2)
+            level: {
+                "count": completed,
+                "accuracy": round((correct / completed * 100) if completed else 0, 2)
             }
+            for level, (completed, correct) in buckets.items()
         },
         "calculated_at": datetime.now().isoformat()
     }
@@ -649,9 +858,12 @@ def export_completed_event_to_bucket(event_data, bucket_name="fight-events"):
         event_id = export_data["event_id"]
         filename = f"{event_id}_complete.json"
         
-        # Convert to JSON string
-        json_data = json.dumps(export_data, indent=2, ensure_ascii=False)
-        json_bytes = json_data.encode('utf-8')
+        # Same compact, gzipped format as scripts/export_to_bucket.py, which writes these files too
+        if orjson_available:
+            json_bytes = orjson.dumps(export_data, option=orjson.OPT_NON_STR_KEYS)
+        else:
+            json_bytes = json.dumps(export_data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        json_bytes = gzip.compress(json_bytes, compresslevel=6)
         
         # Upload to bucket
         logger.info(f"Uploading {filename} to bucket '{bucket_name}'...")
@@ -670,9 +882,7 @@ def export_completed_event_to_bucket(event_data, bucket_name="fight-events"):
         return True
         
     except Exception as e:
-        logger.error(f"Error exporting to bucket: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"Error exporting to bucket: {str(e)}")
         return False
 
 def deactivate_completed_event(event_id):
@@ -719,11 +929,12 @@ def monitor_event():
         return True
     
     # Update event data with results
-    updated_event, updated_count = update_event_with_results(event_data, scraped_results)
+    updated_event, updated_indices = update_event_with_results(event_data, scraped_results)
+    updated_count = len(updated_indices)
     
     if updated_count > 0:
         # Save updated data back to database
-        success = save_updated_event(updated_event)
+        success = save_updated_event(updated_event, updated_indices)
         if success:
             logger.info(f"Successfully updated {updated_count} fights with results")
             
@@ -9,6 +9,7 @@ import logging
 from dotenv import load_dotenv
 import argparse
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
 
@@ -83,8 +84,7 @@ try:
                 
                 # 2. Load Data using DataLoader
                 logger.info("Loading fighters and fights data...")
-                fighters_df = data_loader.load_fighters()
-                fights_df = data_loader.load_fights()
+                fighters_df, fights_df = data_loader.load_fighters_and_fights()
                 logger.info(f"Loaded {len(fighters_df)} fighters and {len(fights_df)} fights.")
                 
                 # Preprocess fights_df date column
@@ -110,6 +110,11 @@ try:
                 model_info = trainer.load_latest_model_from_bucket_direct()
                 logger.info(f"Successfully loaded model: {model_info.get('model_version', 'unknown')} from bucket")
                 
+                try:
+                    trainer.enable_onnx()
+                except Exception as onnx_error:
+                    logger.warning(f"ONNX conversion failed, using XGBoost inference: {str(onnx_error)}")
+                
                 if trainer.model and trainer.features is not None:
                     ml_initialized = True
                     logger.info("ML components initialized successfully.")
@@ -462,9 +467,16 @@ def enrich_matchups_with_ids(matchups):
             matchup["fighter2_image"] = None
         return matchups
     
+    # Look up every fighter concurrently - each lookup is a blocking HTTP round-trip
+    fighter_urls = list(dict.fromkeys(
+        url for matchup in matchups for url in (matchup["fighter1_url"], matchup["fighter2_url"])
+    ))
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        fighter_data_by_url = dict(zip(fighter_urls, executor.map(get_fighter_id_by_url, fighter_urls)))
+    
     for matchup in matchups:
         # Get fighter1 data
-        fighter1_id, fighter1_tap_link, fighter1_image = get_fighter_id_by_url(matchup["fighter1_url"])
+        fighter1_id, fighter1_tap_link, fighter1_image = fighter_data_by_url[matchup["fighter1_url"]]
         if fighter1_id:
             matchup["fighter1_id"] = fighter1_id
             matchup["fighter1_tap_link"] = fighter1_tap_link
@@ -479,7 +491,7 @@ def enrich_matchups_with_ids(matchups):
             matchup["fighter1_page_link"] = None
             
         # Get fighter2 data
-        fighter2_id, fighter2_tap_link, fighter2_image = get_fighter_id_by_url(matchup["fighter2_url"])
+        fighter2_id, fighter2_tap_link, fighter2_image = fighter_data_by_url[matchup["fighter2_url"]]
         if fighter2_id:
             matchup["fighter2_id"] = fighter2_id
             matchup["fighter2_tap_link"] = fighter2_tap_link
@@ -495,6 +507,88 @@ def enrich_matchups_with_ids(matchups):
     
     return matchups
 
+def _build_prediction_features(fighter1_name, fighter2_name):
+    """Generate model features for a matchup in canonical (alphabetical) fighter order.
+
+    Returns (features_dict, order_swapped), or None if features could not be generated.
+    """
+    # Sort names alphabetically for canonical ordering
+    # This ensures consistent feature generation regardless of input order
+    canonical_f1_name, canonical_f2_name = sorted([fighter1_name, fighter2_name])
+    order_swapped = fighter1_name != canonical_f1_name
+    
+    # Use current date as context date
+    context_date = pd.Timestamp.now(tz=timezone.utc)
+    
+    logger.info(f"Generating prediction features for {fighter1_name} vs {fighter2_name}")
+    
+    # Generate prediction features for the canonical fighter order
+    features_dict = analyzer.get_prediction_features(canonical_f1_name, canonical_f2_name, context_date)
+    
+    if not features_dict:
+        logger.warning(f"Could not generate features for {fighter1_name} vs {fighter2_name}")
+        return None
+    
+    return features_dict, order_swapped
+
+def _finalize_prediction(probability_canonical_f1_model, features_dict, order_swapped,
+                         fighter1_name, fighter2_name, fighter1_id, fighter2_id):
+    """Apply the weight adjustment to a model probability and format the prediction result"""
+    # Get weights for possible weight class adjustment
+    f1_weight = features_dict.get('f1_weight', 0.0)
+    f2_weight = features_dict.get('f2_weight', 0.0)
+    
+    # Apply weight adjustment if there's a significant weight difference
+    weight_diff = abs(f1_weight - f2_weight)
+    weight_threshold = 20.0
+    probability_canonical_f1_adjusted = probability_canonical_f1_model
+    
+    if weight_diff > weight_threshold:
+        excess_weight = weight_diff - weight_threshold
+        k = 0.15
+        weight_impact = 1 / (1 + np.exp(-k * excess_weight))
+        
+        if f1_weight > f2_weight:  # Canonical F1 is heavier
+            probability_canonical_f1_adjusted = probability_canonical_f1_model + (1 - probability_canonical_f1_model) * (2 * weight_impact - 1) if weight_impact > 0.5 else probability_canonical_f1_model
+        else:  # Canonical F2 is heavier
+            probability_canonical_f1_adjusted = probability_canonical_f1_model * (1 - (2 * weight_impact - 1)) if weight_impact > 0.5 else probability_canonical_f1_model
+            
+        probability_canonical_f1_adjusted = max(0.0, min(1.0, probability_canonical_f1_adjusted))
+    
+    # Re-orient probability for original input order
+    if order_swapped:
+        # If original F1 was canonical F2, the probability we want is 1 - P(canonical F1)
+        final_probability_for_original_f1 = 1.0 - probability_canonical_f1_adjusted
+    else:
+        # Original F1 was canonical F1, use the probability directly
+        final_probability_for_original_f1 = probability_canonical_f1_adjusted
+    
+    # Determine winner and confidence
+    predicted_winner_name = fighter1_name if final_probability_for_original_f1 >= 0.5 else fighter2_name
+    predicted_winner_id = fighter1_id if predicted_winner_name == fighter1_name else fighter2_id
+    confidence = final_probability_for_original_f1 if predicted_winner_name == fighter1_name else 1.0 - final_probability_for_original_f1
+    
+    # Format the prediction result
+    prediction_result = {
+        "fighter1_name": fighter1_name,
+        "fighter2_name": fighter2_name,
+        "fighter1_id": fighter1_id,
+        "fighter2_id": fighter2_id,
+        "predicted_winner": predicted_winner_id,
+        "predicted_winner_name": predicted_winner_name,
+        "confidence_percent": float(round(confidence * 100, 2)),
+        "fighter1_win_probability_percent": float(round(final_probability_for_original_f1 * 100, 2)),
+        "fighter2_win_probability_percent": float(round((1.0 - final_probability_for_original_f1) * 100, 2))
+    }
+    
+    # Convert NumPy types to Python native types for JSON serialization
+    for key, value in prediction_result.items():
+        if hasattr(value, "item") and callable(getattr(value, "item")):
+            prediction_result[key] = value.item()
+    
+    logger.info(f"Prediction for {fighter1_name} vs {fighter2_name}: Winner {predicted_winner_name} ({round(confidence * 100, 2)}%)")
+    return prediction_result
+
 def predict_fight(fighter1_name, fighter2_name, fighter1_id, fighter2_id):
     """Predict the outcome of a fight between two fighters"""
     if not predictions_available:
@@ -510,109 +604,27 @@ def predict_fight(fighter1_name, fighter2_name, fighter1_id, fighter2_id):
         if not init_ml_components():
             return None
         
-        # Sort names alphabetically for canonical ordering
-        # This ensures consistent feature generation regardless of input order
-        original_fighter1_name = fighter1_name
-        original_fighter2_name = fighter2_name
-        ordered_names = sorted([original_fighter1_name, original_fighter2_name])
-        canonical_f1_name = ordered_names[0]
-        canonical_f2_name = ordered_names[1]
-        order_swapped = original_fighter1_name != canonical_f1_name
-        
-        # Use current date as context date
-        context_date = pd.Timestamp.now(tz=timezone.utc)
-        
-        logger.info(f"Generating prediction features for {fighter1_name} vs {fighter2_name}")
-        
-        # Generate prediction features for the canonical fighter order
-        features_dict = analyzer.get_prediction_features(canonical_f1_name, canonical_f2_name, context_date)
-        
-        if not features_dict:
-            logger.warning(f"Could not generate features for {fighter1_name} vs {fighter2_name}")
+        built = _build_prediction_features(fighter1_name, fighter2_name)
+        if built is None:
             return None
-            
-        # Get weights for possible weight class adjustment
-        f1_weight = features_dict.get('f1_weight', 0.0)
-        f2_weight = features_dict.get('f2_weight', 0.0)
-        
-        # Prepare DataFrame for model prediction
-        prediction_df = pd.DataFrame([features_dict])
-        
-        # Ensure all required features are present
-        model_features = trainer.features
-        for col in model_features:
-            if col not in prediction_df.columns:
-                prediction_df[col] = 0.0
-        prediction_df = prediction_df[model_features]
-        
-        # Clean up data
-        if prediction_df.isna().any().any():
-            prediction_df = prediction_df.fillna(0.0)
-        if np.isinf(prediction_df).any().any():
-            prediction_df.replace([np.inf, -np.inf], 0.0, inplace=True)
+        features_dict, order_swapped = built
         
         # Make prediction
-        probability_canonical_f1_model = trainer.predict_proba(prediction_df)[0][1]
-        
-        # Apply weight adjustment if there's a significant weight difference
-        weight_diff = abs(f1_weight - f2_weight)
-        weight_threshold = 20.0
-        probability_canonical_f1_adjusted = probability_canonical_f1_model
+        probability_canonical_f1_model = trainer.predict_proba(trainer.features_to_matrix([features_dict]))[0][1]
         
-        if weight_diff > weight_threshold:
-            excess_weight = weight_diff - weight_threshold
-            k = 0.15
-            weight_impact = 1 / (1 + np.exp(-k * excess_weight))
-            
-            if f1_weight > f2_weight:  # Canonical F1 is heavier
-                probability_canonical_f1_adjusted = probability_canonical_f1_model + (1 - probability_canonical_f1_model) * (2 * weight_impact - 1) if weight_impact > 0.5 else probability_canonical_f1_model
-            else:  # Canonical F2 is heavier
-                probability_canonical_f1_adjusted = probability_canonical_f1_model * (1 - (2 * weight_impact - 1)) if weight_impact > 0.5 else probability_canonical_f1_model
-                
-            probability_canonical_f1_adjusted = max(0.0, min(1.0, probability_canonical_f1_adjusted))
-        
-        # Re-orient probability for original input order
-        if order_swapped:
-            # If original F1 was canonical F2, the probability we want is 1 - P(canonical F1)
-            final_probability_for_original_f1 = 1.0 - probability_canonical_f1_adjusted
-        else:
-            # Original F1 was canonical F1, use the probability directly
-            final_probability_for_original_f1 = probability_canonical_f1_adjusted
+        return _finalize_prediction(probability_canonical_f1_model, features_dict, order_swapped,
+                                    fighter1_name, fighter2_name, fighter1_id, fighter2_id)
         
-        # Determine winner and confidence
-        predicted_winner_name = original_fighter1_name if final_probability_for_original_f1 >= 0.5 else original_fighter2_name
-        predicted_winner_id = fighter1_id if predicted_winner_name == original_fighter1_name else fighter2_id
-        confidence = final_probability_for_original_f1 if predicted_winner_name == original_fighter1_name else 1.0 - final_probability_for_original_f1
-        
-        # Format the prediction result
-        prediction_result = {
-            "fighter1_name": original_fighter1_name,
-            "fighter2_name": original_fighter2_name,
-            "fighter1_id": fighter1_id,
-            "fighter2_id": fighter2_id,
-            "predicted_winner": predicted_winner_id,
-            "predicted_winner_name": predicted_winner_name,
-            "confidence_percent": float(round(confidence * 100, 2)),
-            "fighter1_win_probability_percent": float(round(final_probability_for_original_f1 * 100, 2)),
-            "fighter2_win_probability_percent": float(round((1.0 - final_probability_for_original_f1) * 100, 2))
-        }
-        
-        # Convert NumPy types to Python native types for JSON serialization
-        for key, value in prediction_result.items():
-            if hasattr(value, "item") and callable(getattr(value, "item")):
-                prediction_result[key] = value.item()
-        
-        logger.info(f"Prediction for {original_fighter1_name} vs {original_fighter2_name}: Winner {predicted_winner_name} ({round(confidence * 100, 2)}%)")
-        return prediction_result
-        
-    except Exception as e:
-        logger.error(f"Error making prediction for {fighter1_name} vs {fighter2_name}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+    except KeyError as e:
+        # Expected when a fighter/feature is missing from the loaded data - no traceback needed
+        logger.warning(f"Missing data for {fighter1_name} vs {fighter2_name}: {e}")
+        return None
+    except Exception:
+        logger.exception(f"Error making prediction for {fighter1_name} vs {fighter2_name}")
         return None
 
 def add_predictions_to_matchups(matchups):
-    """Add predictions to each matchup"""
+    """Add predictions to each matchup, scoring all of them with a single model call"""
     if not predictions_available:
         logger.warning("Predictions are not available. Skipping prediction step.")
         return matchups
@@ -624,25 +636,47 @@ def add_predictions_to_matchups(matchups):
         logger.warning("Failed to initialize ML components. Skipping predictions.")
         return matchups
     
+    # Build features for every matchup first, then run the model once over all of them
+    pending = []
     for i, matchup in enumerate(matchups):
         logger.info(f"Generating prediction for matchup {i+1}/{len(matchups)}: {matchup['fighter1_name']} vs {matchup['fighter2_name']}")
+        matchup['prediction'] = None
         
         # Skip if we don't have both fighter IDs
         if not matchup.get('fighter1_id') or not matchup.get('fighter2_id'):
             logger.warning(f"Skipping prediction for {matchup['fighter1_name']} vs {matchup['fighter2_name']} - missing fighter ID(s)")
-            matchup['prediction'] = None
             continue
         
-        # Get prediction
-        prediction = predict_fight(
-            matchup['fighter1_name'], 
+        try:
+            built = _build_prediction_features(matchup['fighter1_name'], matchup['fighter2_name'])
+        except KeyError as e:
+            logger.warning(f"Missing data for {matchup['fighter1_name']} vs {matchup['fighter2_name']}: {e}")
+            continue
+        except Exception:
+            logger.exception(f"Error making prediction for {matchup['fighter1_name']} vs {matchup['fighter2_name']}")
+            continue
+        
+        if built is not None:
+            pending.append((matchup, *built))
+    
+    if not pending:
+        return matchups
+    
+    try:
+        probabilities = trainer.predict_proba(trainer.features_to_matrix([features for _, features, _ in pending]))[:, 1]
+    except Exception:
+        logger.exception("Error running batch prediction for matchups")
+        return matchups
+    
+    for (matchup, features_dict, order_swapped), probability in zip(pending, probabilities):
+        # Add prediction to matchup
+        matchup['prediction'] = _finalize_prediction(
+            probability, features_dict, order_swapped,
+            matchup['fighter1_name'],
             matchup['fighter2_name'],
             matchup['fighter1_id'],
             matchup['fighter2_id']
         )
-        
-        # Add prediction to matchup
-        matchup['prediction'] = prediction
     
     return matchups
 